@@ -136,7 +136,11 @@ class Descriptor(ABC):
             included in the species given to this descriptor.
         """
         # Check that the system does not have elements that are not in the list
-        # of atomic numbers
+        # of atomic numbers. Arrays are reduced to their unique values in numpy
+        # before building the set, as iterating over large arrays in python is
+        # slow.
+        if isinstance(atomic_numbers, np.ndarray):
+            atomic_numbers = np.unique(atomic_numbers).tolist()
         zs = set(atomic_numbers)
         if not zs.issubset(self._atomic_number_set):
             raise ValueError(
@@ -148,10 +152,22 @@ class Descriptor(ABC):
         """Used to format a float64 numpy array in the final format that will be
         returned to the user.
         """
-        if self.dtype != "float64":
-            input = input.astype(self.dtype)
+        # For sparse output the non-zero entries are gathered directly from the
+        # dense array. This avoids the temporary arrays created by
+        # sparse.COO.from_numpy, and only the non-zero values are converted to
+        # the final precision.
         if self.sparse:
-            input = sp.COO.from_numpy(input)
+            coords = np.nonzero(input)
+            data = input[coords].astype(self.dtype, copy=False)
+            input = sp.COO(
+                np.vstack(coords),
+                data,
+                shape=input.shape,
+                has_duplicates=False,
+                sorted=True,
+            )
+        elif self.dtype != "float64":
+            input = input.astype(self.dtype)
 
         return input
 
@@ -219,13 +235,13 @@ class Descriptor(ABC):
         if n_jobs <= 0:
             raise ValueError("Invalid number of jobs specified.")
 
-        # Split data into n_jobs (almost) equal jobs
+        # Split data into n_jobs (almost) equal jobs. No more jobs than samples
+        # are created, so that no job is left without input.
         n_samples = len(inp)
         is_sparse = self._sparse
-        k, m = divmod(n_samples, n_jobs)
-        jobs = (
-            inp[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)] for i in range(n_jobs)
-        )
+        n_jobs = min(n_jobs, n_samples)
+        boundaries = np.linspace(0, n_samples, n_jobs + 1, dtype=np.int64)
+        jobs = [inp[boundaries[i] : boundaries[i + 1]] for i in range(n_jobs)]
 
         def create_multiple(arguments, func, is_sparse, index, verbose):
             """This is the function that is called by each job but with
@@ -429,13 +445,13 @@ class Descriptor(ABC):
         if n_jobs <= 0:
             raise ValueError("Invalid number of jobs specified.")
 
-        # Split data into n_jobs (almost) equal jobs
+        # Split data into n_jobs (almost) equal jobs. No more jobs than samples
+        # are created, so that no job is left without input.
         n_samples = len(inp)
         is_sparse = self._sparse
-        k, m = divmod(n_samples, n_jobs)
-        jobs = (
-            inp[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)] for i in range(n_jobs)
-        )
+        n_jobs = min(n_jobs, n_samples)
+        boundaries = np.linspace(0, n_samples, n_jobs + 1, dtype=np.int64)
+        jobs = [inp[boundaries[i] : boundaries[i + 1]] for i in range(n_jobs)]
 
         def create_multiple_with_descriptor(arguments, func, index, verbose):
             """This is the function that is called by each job but with
@@ -14,6 +14,8 @@ import numpy as np
 import sparse as sp
 from ase import Atoms
 
+import joblib
+
 from dscribe.descriptors.descriptor import Descriptor
 from dscribe.utils.dimensionality import is1d
 
@@ -87,7 +89,8 @@ class DescriptorLocal(Descriptor):
                 in the same function call. Notice that it typically is faster
                 to calculate both in one go.
             n_jobs (int): Number of parallel jobs to instantiate. Parallellizes
-                the calculation across samples. Defaults to serial calculation
+                the calculation across samples, or across the centers if a
+                single system is given. Defaults to serial calculation
                 with n_jobs=1. If a negative number is given, the number of jobs
                 will be calculated with, n_cpus + n_jobs, where n_cpus is the
                 amount of CPUs as reported by the OS. With only_physical_cores
@@ -120,10 +123,34 @@ class DescriptorLocal(Descriptor):
         """
         method = self.validate_derivatives_method(method, attach)
 
-        # If single system given, skip the parallelization
+        # If single system given, the work is parallelized over the centers if
+        # possible
         if isinstance(system, Atoms):
             n_atoms = len(system)
             indices = self._get_indices(n_atoms, include, exclude)
+            center_chunks = self.get_center_chunks(
+                system, centers, n_jobs, only_physical_cores
+            )
+            if center_chunks is not None:
+                inp = [
+                    (system, chunk, indices, method, attach, return_descriptor)
+                    for chunk in center_chunks
+                ]
+                output = self.derivatives_parallel(
+                    inp,
+                    self.derivatives_single,
+                    len(center_chunks),
+                    None,
+                    None,
+                    return_descriptor,
+                    verbose=verbose,
+                )
+                if return_descriptor:
+                    return (
+                        self.concatenate_centers(output[0]),
+                        self.concatenate_centers(output[1]),
+                    )
+                return self.concatenate_centers(output)
             return self.derivatives_single(
                 system,
                 centers,
@@ -223,6 +250,48 @@ class DescriptorLocal(Descriptor):
 
         return output
 
+    def get_center_chunks(self, system, centers, n_jobs, only_physical_cores=False):
+        """Splits the centers of a single system into (almost) equally sized
+        chunks that can be processed in parallel.
+
+        Args:
+            system (:class:`ase.Atoms`): Atomic structure.
+            centers (list): Centers as given by the user, or None if all atoms
+                are used as centers.
+            n_jobs (int): Number of parallel jobs. Negative values are
+                interpreted in the same way as in create().
+            only_physical_cores (bool): Whether only physical CPUs are counted
+                when a negative n_jobs is given.
+
+        Returns:
+            list | None: The centers for each job, or None if the calculation
+            should not be split. Averaged output is never split as it is not
+            a simple concatenation of the per-center results.
+        """
+        if self.average != "off":
+            return None
+        if n_jobs < 0:
+            n_jobs = joblib.cpu_count(only_physical_cores) + n_jobs
+        if centers is None:
+            centers = np.arange(len(system))
+        n_centers = len(centers)
+        n_chunks = min(n_jobs, n_centers)
+        if n_chunks <= 1:
+            return None
+        k, m = divmod(n_centers, n_chunks)
+        return [
+            centers[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)]
+            for i in range(n_chunks)
+        ]
+
+    def concatenate_centers(self, parts):
+        """Concatenates outputs that were calculated for consecutive chunks of
+        centers along the first axis.
+        """
+        if self._sparse:
+            return sp.concatenate(parts, axis=0)
+        return np.concatenate(parts, axis=0)
+
     def init_descriptor_array(self, n_centers):
         """Return a zero-initialized numpy array for the descriptor."""
         n_features = self.get_number_of_features()
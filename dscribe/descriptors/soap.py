@@ -13,10 +13,12 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+from functools import lru_cache
+
 import numpy as np
 
 from scipy.special import gamma
-from scipy.linalg import sqrtm, inv
+from scipy.linalg import sqrtm
 
 from ase import Atoms
 import ase.geometry.cell
@@ -26,6 +28,259 @@ from dscribe.descriptors.descriptorlocal import DescriptorLocal
 import dscribe.ext
 
 
+# The nodes of the 100-point Gauss-Legendre quadrature on [-1, 1]. These
+# determine the radial grid on which the polynomial basis is integrated.
+_GAUSS_LEGENDRE_100_NODES = np.array(
+    [
+        -0.999713726773441234,
+        -0.998491950639595818,
+        -0.996295134733125149,
+        -0.99312493703744346,
+        -0.98898439524299175,
+        -0.98387754070605702,
+        -0.97780935848691829,
+        -0.97078577576370633,
+        -0.962813654255815527,
+        -0.95390078292549174,
+        -0.94405587013625598,
+        -0.933288535043079546,
+        -0.921609298145333953,
+        -0.90902957098252969,
+        -0.895561644970726987,
+        -0.881218679385018416,
+        -0.86601468849716462,
+        -0.849964527879591284,
+        -0.833083879888400824,
+        -0.815389238339176254,
+        -0.79689789239031448,
+        -0.77762790964949548,
+        -0.757598118519707176,
+        -0.736828089802020706,
+        -0.715338117573056447,
+        -0.69314919935580197,
+        -0.670283015603141016,
+        -0.64676190851412928,
+        -0.622608860203707772,
+        -0.59784747024717872,
+        -0.57250193262138119,
+        -0.546597012065094168,
+        -0.520158019881763057,
+        -0.493210789208190934,
+        -0.465781649773358042,
+        -0.437897402172031513,
+        -0.409585291678301543,
+        -0.380872981624629957,
+        -0.351788526372421721,
+        -0.322360343900529152,
+        -0.292617188038471965,
+        -0.26258812037150348,
+        -0.23230248184497397,
+        -0.201789864095735997,
+        -0.171080080538603275,
+        -0.140203137236113973,
+        -0.109189203580061115,
+        -0.0780685828134366367,
+        -0.046871682421591632,
+        -0.015628984421543083,
+        0.0156289844215430829,
+        0.046871682421591632,
+        0.078068582813436637,
+        0.109189203580061115,
+        0.140203137236113973,
+        0.171080080538603275,
+        0.201789864095735997,
+        0.23230248184497397,
+        0.262588120371503479,
+        0.292617188038471965,
+        0.322360343900529152,
+        0.351788526372421721,
+        0.380872981624629957,
+        0.409585291678301543,
+        0.437897402172031513,
+        0.465781649773358042,
+        0.49321078920819093,
+        0.520158019881763057,
+        0.546597012065094168,
+        0.572501932621381191,
+        0.59784747024717872,
+        0.622608860203707772,
+        0.64676190851412928,
+        0.670283015603141016,
+        0.693149199355801966,
+        0.715338117573056447,
+        0.736828089802020706,
+        0.75759811851970718,
+        0.77762790964949548,
+        0.79689789239031448,
+        0.81538923833917625,
+        0.833083879888400824,
+        0.849964527879591284,
+        0.866014688497164623,
+        0.881218679385018416,
+        0.89556164497072699,
+        0.90902957098252969,
+        0.921609298145333953,
+        0.933288535043079546,
+        0.94405587013625598,
+        0.953900782925491743,
+        0.96281365425581553,
+        0.970785775763706332,
+        0.977809358486918289,
+        0.983877540706057016,
+        0.98898439524299175,
+        0.99312493703744346,
+        0.99629513473312515,
+        0.998491950639595818,
+        0.99971372677344123,
+    ],
+    dtype=np.float64,
+)
+_GAUSS_LEGENDRE_100_NODES.flags.writeable = False
+
+
+def _invsqrt_spd(S):
+    """Returns the inverse square root S^(-1/2) of a symmetric positive
+    definite matrix, or of each matrix in a stack of shape (..., n, n).
+
+    The diagonally scaled matrix is Cholesky factorized, S = L L^T, and with
+    the singular value decomposition L = U s V^T the inverse square root is
+    given by U s^(-1) U^T. Working with the factor instead of S itself keeps
+    the small eigenvalues of the ill-conditioned overlap matrices accurate. If
+    S is not numerically positive definite, the general matrix square root of
+    the inverse is returned instead, which can be complex.
+    """
+    d = 1 / np.sqrt(np.diagonal(S, axis1=-2, axis2=-1))
+    try:
+        L = np.linalg.cholesky(d[..., :, None] * S * d[..., None, :])
+    except np.linalg.LinAlgError:
+        if S.ndim == 2:
+            return sqrtm(np.linalg.inv(S))
+        return np.array([_invsqrt_spd(S_i) for S_i in S])
+    U, s, _ = np.linalg.svd(L / d[..., :, None])
+    return (U / s[..., None, :]) @ np.swapaxes(U, -1, -2)
+
+
+@lru_cache(maxsize=None)
+def _get_location_indices(i, j, n_elem, n_max, l_max, crossover):
+    """Returns the start and end indices of the output for the internal species
+    indices i <= j. Only integer arithmetic is used, and the results are cached
+    as they only depend on the given integers.
+    """
+    n_elem_feat_symm = n_max * (n_max + 1) // 2 * (l_max + 1)
+    if not crossover:
+        start = i * n_elem_feat_symm
+        return start, start + n_elem_feat_symm
+
+    n_elem_feat_unsymm = n_max * n_max * (l_max + 1)
+    n_elem_feat = n_elem_feat_symm if i == j else n_elem_feat_unsymm
+
+    # The diagonal terms are symmetric and off-diagonal terms are
+    # unsymmetric
+    m_symm = i + int(j > i)
+    m_unsymm = j + i * n_elem - i * (i + 1) // 2 - m_symm
+
+    start = m_symm * n_elem_feat_symm + m_unsymm * n_elem_feat_unsymm
+    return start, start + n_elem_feat
+
+
+@lru_cache(maxsize=32)
+def _get_basis_gto(r_cut, n_max, l_max):
+    """Cached implementation of SOAP.get_basis_gto. The returned arrays are
+    shared between descriptors and are thus read-only.
+    """
+    # These are the values for where the different basis functions should decay
+    # to: evenly space between 1 angstrom and r_cut.
+    a = np.linspace(1, r_cut, n_max)
+    threshold = 1e-3  # This is the fixed gaussian decay threshold
+
+    # The alphas are calculated so that the GTOs will decay to the set
+    # threshold value at their respective cutoffs. All values of l are
+    # handled at once.
+    l = np.arange(l_max + 1)[:, None]
+    alphas_full = -np.log(threshold / np.power(a, l)) / a**2
+
+    # Calculate the overlap matrices for each l
+    m = alphas_full[:, :, None] + alphas_full[:, None, :]
+    l = l[:, :, None]
+    S = 0.5 * gamma(l + 3.0 / 2.0) * m ** (-l - 3.0 / 2.0)
+
+    # Get the beta factors that orthonormalize the sets with Löwdin
+    # orthonormalization
+    betas_full = _invsqrt_spd(S)
+
+    # If the result is complex, the calculation is currently halted.
+    if betas_full.dtype == np.complex128:
+        raise ValueError(
+            "Could not calculate normalization factors for the radial "
+            "basis in the domain of real numbers. Lowering the number of "
+            "radial basis functions (n_max) or increasing the radial "
+            "cutoff (r_cut) is advised."
+        )
+
+    alphas_full.flags.writeable = False
+    betas_full.flags.writeable = False
+    return alphas_full, betas_full
+
+
+@lru_cache(maxsize=32)
+def _get_basis_poly(r_cut, n_max):
+    """Cached implementation of SOAP.get_basis_poly. The returned arrays are
+    shared between descriptors and are thus read-only.
+    """
+    # Calculate the overlap of the different polynomial functions in a
+    # matrix S. These overlaps defined through the dot product over the
+    # radial coordinate are analytically calculable: Integrate[(rc - r)^(a
+    # + 2) (rc - r)^(b + 2) r^2, {r, 0, rc}]. Then the weights B that make
+    # the basis orthonormal are given by B=S^{-1/2}
+    # The denominator only depends on the exponent sum a + b and is exact in
+    # integer arithmetic.
+    i = np.arange(1, n_max + 1, dtype=np.int64)
+    ij = i[:, None] + i[None, :]
+    den = (5 + ij) * (6 + ij) * (7 + ij)
+
+    # The powers r_cut^(7 + s) for s = 2, ..., 2 * n_max form a geometric
+    # progression that is filled once and indexed with the exponent sums.
+    r_cut = float(r_cut)
+    powers = np.empty(2 * n_max - 1)
+    powers[0] = r_cut**9
+    for k in range(1, len(powers)):
+        powers[k] = powers[k - 1] * r_cut
+    S = (2 * powers[ij - 2]) / den
+
+    # Get the beta factors that orthonormalize the set with Löwdin
+    # orthonormalization
+    betas = _invsqrt_spd(S)
+
+    # If the result is complex, the calculation is currently halted.
+    if betas.dtype == np.complex128:
+        raise ValueError(
+            "Could not calculate normalization factors for the radial "
+            "basis in the domain of real numbers. Lowering the number of "
+            "radial basis functions (n_max) or increasing the radial "
+            "cutoff (r_cut) is advised."
+        )
+
+    # The radial basis is integrated in a very specific nonlinearly spaced
+    # grid given by rx
+    x = _GAUSS_LEGENDRE_100_NODES
+    rx = r_cut * 0.5 * (x + 1)
+
+    # Calculate the value of the orthonormalized polynomial basis at the rx
+    # values. The exponents are consecutive, so each row is obtained from
+    # the previous one with a single multiplication.
+    base = r_cut - np.clip(rx, 0, r_cut)
+    fs = np.empty([n_max, len(x)])
+    fs[0, :] = base**3
+    for n in range(1, n_max):
+        np.multiply(fs[n - 1, :], base, out=fs[n, :])
+
+    gss = np.dot(betas, fs)
+
+    rx.flags.writeable = False
+    gss.flags.writeable = False
+    return rx, gss
+
+
 class SOAP(DescriptorLocal):
     """Class for generating a partial power spectrum from Smooth Overlap of
     Atomic Orbitals (SOAP). This implementation uses real (tesseral) spherical
@@ -63,6 +318,7 @@ class SOAP(DescriptorLocal):
         periodic=False,
         sparse=False,
         dtype="float64",
+        radial_grid=None,
     ):
         """
         Args:
@@ -162,6 +418,14 @@ class SOAP(DescriptorLocal):
                     * ``"float32"``: Single precision floating point numbers.
                     * ``"float64"``: Double precision floating point numbers.
 
+            radial_grid (float): Grid spacing in angstroms for tabulating the
+                radial Gaussians of the GTO basis. When given, the Gaussian of
+                each neighbour is assembled from one-dimensional lookup tables
+                along the Cartesian axes instead of evaluating an exponential
+                for each neighbour. This speeds up the calculation at the cost
+                of a small error that decreases with the grid spacing. Only
+                available for ``rbf="gto"``. Defaults to None, in which case
+                the Gaussians are evaluated exactly.
         """
         supported_dtype = set(("float32", "float64"))
         if dtype not in supported_dtype:
@@ -180,6 +444,10 @@ class SOAP(DescriptorLocal):
                 "Only positive gaussian width parameters 'sigma' are allowed."
             )
         self._eta = 1 / (2 * sigma**2)
+
+        # The cutoff padding only depends on sigma, see get_cutoff_padding.
+        threshold = 0.001
+        self._cutoff_padding = sigma * np.sqrt(-2 * np.log(threshold))
         self._sigma = sigma
 
         supported_rbf = {"gto", "polynomial"}
@@ -256,8 +524,25 @@ class SOAP(DescriptorLocal):
                     "When using the gaussian radial basis set (gto), the radial "
                     "cutoff should be bigger than 1 angstrom."
                 )
+            if radial_grid is not None and radial_grid <= 0:
+                raise ValueError(
+                    "The radial grid spacing should be positive, you have "
+                    "requested radial_grid={}".format(radial_grid)
+                )
             # Precalculate the alpha and beta constants for the GTO basis
             self._alphas, self._betas = self.get_basis_gto(r_cut, n_max, l_max)
+            self._alphas_flat = self._alphas.ravel()
+            self._betas_flat = self._betas.ravel()
+        elif rbf == "polynomial":
+            if radial_grid is not None:
+                raise ValueError(
+                    "The radial grid tabulation is only available for the "
+                    "gaussian radial basis set (gto)."
+                )
+            # Precalculate the discretized and orthogonalized polynomial
+            # radial basis function values
+            self._rx, gss = self.get_basis_poly(r_cut, n_max)
+            self._gss_flat = gss.ravel()
 
         # Test l_max
         if l_max < 0:
@@ -273,14 +558,85 @@ class SOAP(DescriptorLocal):
         self._n_max = n_max
         self._l_max = l_max
         self._rbf = rbf
+        self._radial_grid = radial_grid
         self.average = average
         self.crossover = crossover
+        self._ext = None
+        self._ext_key = None
+
+    def __getstate__(self):
+        """The C++ extension object cannot be pickled. It is dropped from the
+        pickled state and recreated on demand.
+        """
+        state = self.__dict__.copy()
+        state["_ext"] = None
+        state["_ext_key"] = None
+        return state
+
+    def _get_extension(self):
+        """Returns the C++ extension object that is used to calculate the
+        output. The object only depends on the descriptor setup and is thus
+        created once and reused for all systems.
+        """
+        key = (
+            self.crossover,
+            self.average,
+            self.periodic,
+            tuple(self._atomic_numbers),
+        )
+        if self._ext is None or self._ext_key != key:
+            cutoff_padding = self.get_cutoff_padding()
+            if self._rbf == "gto":
+                self._ext = dscribe.ext.SOAPGTO(
+                    self._r_cut,
+                    self._n_max,
+                    self._l_max,
+                    self._eta,
+                    self._weighting,
+                    self.crossover,
+                    self.average,
+                    cutoff_padding,
+                    self._alphas_flat,
+                    self._betas_flat,
+                    self._atomic_numbers,
+                    self.periodic,
+                    0.0 if self._radial_grid is None else float(self._radial_grid),
+                )
+            elif self._rbf == "polynomial":
+                self._ext = dscribe.ext.SOAPPolynomial(
+                    self._r_cut,
+                    self._n_max,
+                    self._l_max,
+                    self._eta,
+                    self._weighting,
+                    self.crossover,
+                    self.average,
+                    cutoff_padding,
+                    self._rx,
+                    self._gss_flat,
+                    self._atomic_numbers,
+                    self.periodic,
+                )
+            self._ext_key = key
+        return self._ext
 
     def prepare_centers(self, system, centers=None):
         """Validates and prepares the centers for the C++ extension."""
+        self._validate_system(system)
+        return self._get_centers(system.get_positions(), centers)
+
+    def _validate_system(self, system):
+        """Checks that the given system can be used with this descriptor."""
         # Check that the system does not have elements that are not in the list
-        # of atomic numbers
-        self.check_atomic_numbers(system.get_atomic_numbers())
+        # of atomic numbers. The lookup table is used for the common case, and
+        # check_atomic_numbers reports the offending elements.
+        atomic_numbers = system.get_atomic_numbers()
+        if len(atomic_numbers) != 0 and (
+            atomic_numbers.min() < 0
+            or atomic_numbers.max() >= len(self._z_to_index)
+            or (self._z_to_index[atomic_numbers] < 0).any()
+        ):
+            self.check_atomic_numbers(atomic_numbers)
 
         # Check if periodic is valid
         if self.periodic:
@@ -288,10 +644,14 @@ class SOAP(DescriptorLocal):
             if np.cross(cell[0], cell[1]).dot(cell[2]) == 0:
                 raise ValueError("System doesn't have cell to justify periodicity.")
 
+    def _get_centers(self, positions, centers=None):
+        """Returns the cartesian centers and their atomic indices (-1 for
+        cartesian input) given the atomic positions of the system.
+        """
         # Setup the local positions
         if centers is None:
-            list_positions = system.get_positions()
-            indices = np.arange(len(system))
+            list_positions = positions
+            indices = np.arange(len(positions))
         else:
             # Check validity of position definitions and create final cartesian
             # position list
@@ -303,11 +663,34 @@ class SOAP(DescriptorLocal):
             )
             if not isinstance(centers, (list, tuple, np.ndarray)) or len(centers) == 0:
                 raise error
+
+            # Homogeneous input (only indices or only cartesian positions) is
+            # handled with vectorized numpy operations. Mixed input falls
+            # back to validating each center separately.
+            try:
+                centers_array = np.asarray(centers)
+            except ValueError:
+                centers_array = None
+            if centers_array is not None:
+                if centers_array.ndim == 1 and np.issubdtype(
+                    centers_array.dtype, np.integer
+                ):
+                    indices = centers_array.astype(np.int64)
+                    return positions[indices], indices
+                if (
+                    centers_array.ndim == 2
+                    and centers_array.shape[1] == 3
+                    and np.issubdtype(centers_array.dtype, np.number)
+                    and not np.issubdtype(centers_array.dtype, np.complexfloating)
+                ):
+                    indices = np.full(len(centers_array), -1, dtype=np.int64)
+                    return centers_array.astype(np.float64), indices
+
             list_positions = []
             indices = np.full(len(centers), -1, dtype=np.int64)
             for idx, i in enumerate(centers):
                 if np.issubdtype(type(i), np.integer):
-                    list_positions.append(system.get_positions()[i])
+                    list_positions.append(positions[i])
                     indices[idx] = i
                 elif isinstance(i, (list, tuple, np.ndarray)):
                     if len(i) != 3:
@@ -323,9 +706,16 @@ class SOAP(DescriptorLocal):
         the used used sigma value. The padding is chosen so that the gaussians
         decay to the specified threshold value at the cutoff distance.
         """
-        threshold = 0.001
-        cutoff_padding = self._sigma * np.sqrt(-2 * np.log(threshold))
-        return cutoff_padding
+        return self._cutoff_padding
+
+    def _get_cell(self, system):
+        """Returns the cell that is passed to the extension. The cell is only
+        used for extending periodic systems, so completing it is skipped when
+        periodicity is not requested.
+        """
+        if self.periodic:
+            return ase.geometry.cell.complete_cell(system.get_cell())
+        return system.cell.array
 
     def _infer_r_cut(self, weighting):
         """Used to determine an appropriate r_cut based on where the given
@@ -353,9 +743,18 @@ class SOAP(DescriptorLocal):
             return None
 
     def init_internal_dev_array(self, n_centers, n_atoms, n_types, n, l_max):
+        # The polynomial basis stores the real and imaginary parts of the
+        # complex coefficients.
+        n_coeffs = (l_max + 1) * (l_max + 1)
+        if self._rbf == "polynomial":
+            n_coeffs *= 2
+        # The coefficient derivatives are only intermediates for the
+        # derivatives of the power spectrum, which are always accumulated in
+        # double precision. They are stored in the output precision, which
+        # halves the memory use for float32 output.
         d = np.zeros(
-            (n_atoms, n_centers, n_types, n, (l_max + 1) * (l_max + 1)),
-            dtype=np.float64,
+            (n_atoms, n_centers, n_types, n, n_coeffs),
+            dtype=self.dtype,
         )
         return d
 
@@ -372,14 +771,16 @@ class SOAP(DescriptorLocal):
 
         Args:
             system (:class:`ase.Atoms` or list of :class:`ase.Atoms`): One or
-                many atomic structures.
+                many atomic structures. A :class:`.SoapContext` created with
+                :meth:`context` can be given in place of a structure.
             centers (list): Centers where to calculate SOAP. Can be
                 provided as cartesian positions or atomic indices. If no
                 centers are defined, the SOAP output will be created for all
                 atoms in the system. When calculating SOAP for multiple
                 systems, provide the centers as a list for each system.
             n_jobs (int): Number of parallel jobs to instantiate. Parallellizes
-                the calculation across samples. Defaults to serial calculation
+                the calculation across samples, or across the centers if a
+                single system is given. Defaults to serial calculation
                 with n_jobs=1. If a negative number is given, the used cpus
                 will be calculated with, n_cpus + n_jobs, where n_cpus is the
                 amount of CPUs as reported by the OS. With only_physical_cores
@@ -400,8 +801,33 @@ class SOAP(DescriptorLocal):
             provided the results are ordered by the input order of systems and
             their positions.
         """
-        # Validate input / combine input arguments
-        if isinstance(system, Atoms):
+        # Validate input / combine input arguments. For a single system the
+        # work is parallelized over the centers if possible.
+        if isinstance(system, (Atoms, SoapContext)):
+            center_chunks = self.get_center_chunks(
+                system, centers, n_jobs, only_physical_cores
+            )
+            if center_chunks is not None:
+                # The periodic extension and the cell list are only created
+                # once and shared by the threads, so that only the loop over
+                # the centers is split.
+                if isinstance(system, Atoms):
+                    context = self.context(system)
+                else:
+                    context = system
+                    self._check_context(context)
+                inp = [
+                    (self._get_centers(context.positions, chunk)[0], context)
+                    for chunk in center_chunks
+                ]
+                output = self.create_parallel(
+                    inp,
+                    self._create_centers,
+                    len(center_chunks),
+                    verbose=verbose,
+                    prefer="threads",
+                )
+                return self.concatenate_centers(output)
             system = [system]
             centers = [centers]
         n_samples = len(system)
@@ -422,33 +848,25 @@ class SOAP(DescriptorLocal):
         if self.average == "outer" or self.average == "inner":
             static_size = [n_features]
         else:
+            # The number of centers for each sample is gathered in a single
+            # pass. The output size is static if all samples have the same
+            # number of centers.
             if centers is None:
-                n_centers = len(inp[0][0])
+                sizes = np.array([len(i_sys) for i_sys in system], dtype=np.int64)
             else:
-                first_sample, first_pos = inp[0]
-                if first_pos is not None:
-                    n_centers = len(first_pos)
-                else:
-                    n_centers = len(first_sample)
-
-            def is_static():
-                for i_job in inp:
-                    if centers is None:
-                        if len(i_job[0]) != n_centers:
-                            return False
-                    else:
-                        if i_job[1] is not None:
-                            if len(i_job[1]) != n_centers:
-                                return False
-                        else:
-                            if len(i_job[0]) != n_centers:
-                                return False
-                return True
-
-            if is_static():
-                static_size = [n_centers, n_features]
-
-        # Create in parallel
+                sizes = np.array(
+                    [
+                        len(i_sys) if i_pos is None else len(i_pos)
+                        for i_sys, i_pos in zip(system, centers)
+                    ],
+                    dtype=np.int64,
+                )
+            if np.all(sizes == sizes[0]):
+                static_size = [int(sizes[0]), n_features]
+
+        # Create in parallel. The extension releases the GIL during the
+        # calculation, so threads are used to avoid serializing the systems
+        # and the descriptor to separate processes.
         output = self.create_parallel(
             inp,
             self.create_single,
@@ -456,6 +874,7 @@ class SOAP(DescriptorLocal):
             static_size,
             only_physical_cores,
             verbose=verbose,
+            prefer="threads",
         )
 
         return output
@@ -464,7 +883,9 @@ class SOAP(DescriptorLocal):
         """Return the SOAP output for the given system and given centers.
 
         Args:
-            system (:class:`ase.Atoms` | :class:`.System`): Input system.
+            system (:class:`ase.Atoms` | :class:`.System` | :class:`.SoapContext`):
+                Input system, or a context created for it with
+                :meth:`context`.
             centers (list): Cartesian positions or atomic indices. If
                 specified, the SOAP spectrum will be created for these points.
                 If no centers are defined, the SOAP output will be created
@@ -477,70 +898,25 @@ class SOAP(DescriptorLocal):
             centers and the second dimension is determined by the
             get_number_of_features()-function.
         """
-        cutoff_padding = self.get_cutoff_padding()
-        centers, _ = self.prepare_centers(system, centers)
-        n_centers = centers.shape[0]
-        pos = system.get_positions()
-        Z = system.get_atomic_numbers()
-        soap_mat = self.init_descriptor_array(n_centers)
-
-        # Determine the function to call based on rbf
-        if self._rbf == "gto":
-            # Orthonormalized RBF coefficients
-            alphas = self._alphas.flatten()
-            betas = self._betas.flatten()
-
-            # Calculate with extension
-            soap_gto = dscribe.ext.SOAPGTO(
-                self._r_cut,
-                self._n_max,
-                self._l_max,
-                self._eta,
-                self._weighting,
-                self.crossover,
-                self.average,
-                cutoff_padding,
-                alphas,
-                betas,
-                self._atomic_numbers,
-                self.periodic,
-            )
-
-            # Calculate analytically with extension
-            soap_gto.create(
-                soap_mat,
-                pos,
-                Z,
-                ase.geometry.cell.complete_cell(system.get_cell()),
-                np.asarray(system.get_pbc(), dtype=bool),
-                centers,
-            )
-        elif self._rbf == "polynomial":
-            # Get the discretized and orthogonalized polynomial radial basis
-            # function values
-            rx, gss = self.get_basis_poly(self._r_cut, self._n_max)
-            gss = gss.flatten()
+        if isinstance(system, SoapContext):
+            self._check_context(system)
+            centers, _ = self._get_centers(system.positions, centers)
+            soap_mat = self._create_centers(centers, system)
+        else:
+            # The positions are copied out of the system only once and shared
+            # by the center setup and the extension.
+            self._validate_system(system)
+            positions = system.get_positions()
+            centers, _ = self._get_centers(positions, centers)
+            n_centers = centers.shape[0]
+            soap_mat = self.init_descriptor_array(n_centers)
 
             # Calculate with extension
-            soap_poly = dscribe.ext.SOAPPolynomial(
-                self._r_cut,
-                self._n_max,
-                self._l_max,
-                self._eta,
-                self._weighting,
-                self.crossover,
-                self.average,
-                cutoff_padding,
-                rx,
-                gss,
-                self._atomic_numbers,
-                self.periodic,
-            )
-            soap_poly.create(
+            self._get_extension().create(
                 soap_mat,
-                pos,
-                Z,
-                ase.geometry.cell.complete_cell(system.get_cell()),
+                positions,
+                system.get_atomic_numbers(),
+                self._get_cell(system),
                 np.asarray(system.get_pbc(), dtype=bool),
                 centers,
             )
@@ -553,6 +929,76 @@ class SOAP(DescriptorLocal):
 
         return soap_mat
 
+    def context(self, system):
+        """Prepares the given system for repeated SOAP evaluations with this
+        descriptor. The system is validated, periodically extended if needed
+        and a cell list is built for the neighbour search only once. The
+        returned context can then be passed to :meth:`create` or
+        :meth:`create_single` in place of the system, e.g. when evaluating
+        SOAP for many different sets of centers. Changes to the system after
+        creating the context are not reflected in it.
+
+        Args:
+            system (:class:`ase.Atoms`): Input system.
+
+        Returns:
+            :class:`.SoapContext`: The precalculated data for the system.
+        """
+        self._validate_system(system)
+        positions = np.ascontiguousarray(system.get_positions(), dtype=np.float64)
+        atomic_numbers = np.ascontiguousarray(
+            system.get_atomic_numbers(), dtype=np.int32
+        )
+        neighbour_positions = positions
+        neighbour_atomic_numbers = atomic_numbers
+        pbc = np.asarray(system.get_pbc(), dtype=bool)
+        cutoff = self._r_cut + self._cutoff_padding
+        if self.periodic and pbc.any():
+            extended = dscribe.ext.extend_system(
+                positions, atomic_numbers, self._get_cell(system), pbc, cutoff
+            )
+            neighbour_positions = extended.positions
+            neighbour_atomic_numbers = extended.atomic_numbers
+        cell_list = dscribe.ext.CellList(neighbour_positions, cutoff)
+        return SoapContext(
+            positions,
+            atomic_numbers,
+            neighbour_positions,
+            neighbour_atomic_numbers,
+            cell_list,
+            self._get_context_key(),
+        )
+
+    def _get_context_key(self):
+        """Returns the settings that a context depends on."""
+        return (
+            self._r_cut + self._cutoff_padding,
+            self.periodic,
+            tuple(self._atomic_numbers),
+        )
+
+    def _check_context(self, context):
+        """Checks that the given context was created for the current setup."""
+        if context.key != self._get_context_key():
+            raise ValueError(
+                "The given context was created for a SOAP descriptor with "
+                "different settings. Create a new context with context()."
+            )
+
+    def _create_centers(self, centers, context):
+        """Return the SOAP output for the given cartesian centers using the
+        precalculated data in the given context.
+        """
+        soap_mat = self.init_descriptor_array(centers.shape[0])
+        self._get_extension().create(
+            soap_mat,
+            context.neighbour_positions,
+            context.neighbour_atomic_numbers,
+            centers,
+            context.cell_list,
+        )
+        return soap_mat
+
     def validate_derivatives_method(self, method, attach):
         """Used to validate and determine the final method for calculating the
         derivatives.
@@ -567,11 +1013,6 @@ class SOAP(DescriptorLocal):
 
         # Check if analytical derivatives can be used
         try:
-            if self._rbf == "polynomial":
-                raise ValueError(
-                    "Analytical derivatives not currently available for polynomial "
-                    "radial basis set."
-                )
             if self.average != "off":
                 raise ValueError(
                     "Analytical derivatives not currently available for averaged output."
@@ -621,75 +1062,24 @@ class SOAP(DescriptorLocal):
         """
         pos = system.get_positions()
         Z = system.get_atomic_numbers()
-        cell = ase.geometry.cell.complete_cell(system.get_cell())
+        cell = self._get_cell(system)
         pbc = np.asarray(system.get_pbc(), dtype=bool)
-        cutoff_padding = self.get_cutoff_padding()
         centers, center_indices = self.prepare_centers(system, centers)
 
-        if self._rbf == "gto":
-            alphas = self._alphas.flatten()
-            betas = self._betas.flatten()
-            soap_gto = dscribe.ext.SOAPGTO(
-                self._r_cut,
-                self._n_max,
-                self._l_max,
-                self._eta,
-                self._weighting,
-                self.crossover,
-                self.average,
-                cutoff_padding,
-                alphas,
-                betas,
-                self._atomic_numbers,
-                self.periodic,
-            )
-
-            # Calculate numerically with extension
-            soap_gto.derivatives_numerical(
-                d,
-                c,
-                pos,
-                Z,
-                cell,
-                pbc,
-                centers,
-                center_indices,
-                indices,
-                attach,
-                return_descriptor,
-            )
-        elif self._rbf == "polynomial":
-            rx, gss = self.get_basis_poly(self._r_cut, self._n_max)
-            gss = gss.flatten()
-
-            # Calculate numerically with extension
-            soap_poly = dscribe.ext.SOAPPolynomial(
-                self._r_cut,
-                self._n_max,
-                self._l_max,
-                self._eta,
-                self._weighting,
-                self.crossover,
-                self.average,
-                cutoff_padding,
-                rx,
-                gss,
-                self._atomic_numbers,
-                self.periodic,
-            )
-            soap_poly.derivatives_numerical(
-                d,
-                c,
-                pos,
-                Z,
-                ase.geometry.cell.complete_cell(system.get_cell()),
-                np.asarray(system.get_pbc(), dtype=bool),
-                centers,
-                center_indices,
-                indices,
-                attach,
-                return_descriptor,
-            )
+        # Calculate numerically with extension
+        self._get_extension().derivatives_numerical(
+            d,
+            c,
+            pos,
+            Z,
+            cell,
+            pbc,
+            centers,
+            center_indices,
+            indices,
+            attach,
+            return_descriptor,
+        )
 
     def derivatives_analytical(
         self,
@@ -721,32 +1111,14 @@ class SOAP(DescriptorLocal):
         """
         pos = system.get_positions()
         Z = system.get_atomic_numbers()
-        cell = ase.geometry.cell.complete_cell(system.get_cell())
+        cell = self._get_cell(system)
         pbc = np.asarray(system.get_pbc(), dtype=bool)
-        cutoff_padding = self.get_cutoff_padding()
         centers, center_indices = self.prepare_centers(system, centers)
         sorted_species = self._atomic_numbers
         n_species = len(sorted_species)
         n_centers = centers.shape[0]
         n_atoms = len(system)
 
-        alphas = self._alphas.flatten()
-        betas = self._betas.flatten()
-        soap_gto = dscribe.ext.SOAPGTO(
-            self._r_cut,
-            self._n_max,
-            self._l_max,
-            self._eta,
-            self._weighting,
-            self.crossover,
-            self.average,
-            cutoff_padding,
-            alphas,
-            betas,
-            self._atomic_numbers,
-            self.periodic,
-        )
-
         # These arrays are only used internally by the C++ code.
         # Allocating them here with python is much faster than
         # allocating similarly sized arrays within C++. It seems
@@ -763,7 +1135,7 @@ class SOAP(DescriptorLocal):
             n_centers, n_atoms, n_species, self._n_max, self._l_max
         )
 
-        soap_gto.derivatives_analytical(
+        self._get_extension().derivatives_analytical(
             d,
             c,
             xd,
@@ -804,6 +1176,11 @@ class SOAP(DescriptorLocal):
             self.index_to_atomic_number[i_atom] = atomic_number
         self.n_elements = len(self._atomic_numbers)
 
+        # Lookup table from atomic number to the internal index, -1 for species
+        # that are not included. Used for vectorized checks of whole systems.
+        self._z_to_index = np.full(len(ase.data.chemical_symbols), -1, dtype=np.int32)
+        self._z_to_index[self._atomic_numbers] = np.arange(self.n_elements)
+
     def get_number_of_features(self):
         """Used to inquire the final number of features that this descriptor
         will have.
@@ -811,12 +1188,12 @@ class SOAP(DescriptorLocal):
         Returns:
             int: Number of features for this descriptor.
         """
-        n_elem = len(self._atomic_numbers)
+        n_elem = self.n_elements
         if self.crossover:
             n_elem_radial = n_elem * self._n_max
-            return int((n_elem_radial) * (n_elem_radial + 1) / 2 * (self._l_max + 1))
+            return n_elem_radial * (n_elem_radial + 1) // 2 * (self._l_max + 1)
         else:
-            return int(n_elem * self._n_max * (self._n_max + 1) / 2 * (self._l_max + 1))
+            return n_elem * (self._n_max * (self._n_max + 1) // 2) * (self._l_max + 1)
 
     def get_location(self, species):
         """Can be used to query the location of a species combination in the
@@ -849,41 +1226,25 @@ class SOAP(DescriptorLocal):
                     raise ValueError("Invalid chemical species: {}".format(specie))
             numbers.append(specie)
 
-        # See if species defined
+        # See if species defined and change into internal indexing
+        indices = []
         for number in numbers:
-            if number not in self._atomic_number_set:
+            index = self.atomic_number_to_index.get(number)
+            if index is None:
                 raise ValueError(
                     "Atomic number {} was not specified in the species.".format(number)
                 )
-
-        # Change into internal indexing
-        numbers = [self.atomic_number_to_index[x] for x in numbers]
+            indices.append(index)
         n_elem = self.n_elements
 
-        if numbers[0] > numbers[1]:
-            numbers = list(reversed(numbers))
-        i = numbers[0]
-        j = numbers[1]
-        n_elem_feat_symm = self._n_max * (self._n_max + 1) / 2 * (self._l_max + 1)
-
-        if self.crossover:
-            n_elem_feat_unsymm = self._n_max * self._n_max * (self._l_max + 1)
-            n_elem_feat = n_elem_feat_symm if i == j else n_elem_feat_unsymm
-
-            # The diagonal terms are symmetric and off-diagonal terms are
-            # unsymmetric
-            m_symm = i + int(j > i)
-            m_unsymm = j + i * n_elem - i * (i + 1) / 2 - m_symm
-
-            start = int(m_symm * n_elem_feat_symm + m_unsymm * n_elem_feat_unsymm)
-            end = int(start + n_elem_feat)
-        else:
-            if i != j:
-                raise ValueError(
-                    "Crossover is set to False. No cross-species output " "available"
-                )
-            start = int(i * n_elem_feat_symm)
-            end = int(start + n_elem_feat_symm)
+        i, j = min(indices), max(indices)
+        if not self.crossover and i != j:
+            raise ValueError(
+                "Crossover is set to False. No cross-species output " "available"
+            )
+        start, end = _get_location_indices(
+            i, j, n_elem, self._n_max, self._l_max, bool(self.crossover)
+        )
 
         return slice(start, end)
 
@@ -897,44 +1258,9 @@ class SOAP(DescriptorLocal):
 
         Returns:
             (np.ndarray, np.ndarray): The alpha and beta prefactors for all bases
-            up to a fixed size of l=10.
+            up to a fixed size of l=10. The arrays are cached and read-only.
         """
-        # These are the values for where the different basis functions should decay
-        # to: evenly space between 1 angstrom and r_cut.
-        a = np.linspace(1, r_cut, n_max)
-        threshold = 1e-3  # This is the fixed gaussian decay threshold
-
-        alphas_full = np.zeros((l_max + 1, n_max))
-        betas_full = np.zeros((l_max + 1, n_max, n_max))
-
-        for l in range(0, l_max + 1):
-            # The alphas are calculated so that the GTOs will decay to the set
-            # threshold value at their respective cutoffs
-            alphas = -np.log(threshold / np.power(a, l)) / a**2
-
-            # Calculate the overlap matrix
-            m = np.zeros((alphas.shape[0], alphas.shape[0]))
-            m[:, :] = alphas
-            m = m + m.transpose()
-            S = 0.5 * gamma(l + 3.0 / 2.0) * m ** (-l - 3.0 / 2.0)
-
-            # Get the beta factors that orthonormalize the set with Löwdin
-            # orthonormalization
-            betas = sqrtm(inv(S))
-
-            # If the result is complex, the calculation is currently halted.
-            if betas.dtype == np.complex128:
-                raise ValueError(
-                    "Could not calculate normalization factors for the radial "
-                    "basis in the domain of real numbers. Lowering the number of "
-                    "radial basis functions (n_max) or increasing the radial "
-                    "cutoff (r_cut) is advised."
-                )
-
-            alphas_full[l, :] = alphas
-            betas_full[l, :, :] = betas
-
-        return alphas_full, betas_full
+        return _get_basis_gto(float(r_cut), int(n_max), int(l_max))
 
     def get_basis_poly(self, r_cut, n_max):
         """Used to calculate discrete vectors for the polynomial basis functions.
@@ -947,144 +1273,42 @@ class SOAP(DescriptorLocal):
             (np.ndarray, np.ndarray): Tuple containing the evaluation points in
             radial direction as the first item, and the corresponding
             orthonormalized polynomial radial basis set as the second item.
+            The arrays are cached and read-only.
         """
-        # Calculate the overlap of the different polynomial functions in a
-        # matrix S. These overlaps defined through the dot product over the
-        # radial coordinate are analytically calculable: Integrate[(rc - r)^(a
-        # + 2) (rc - r)^(b + 2) r^2, {r, 0, rc}]. Then the weights B that make
-        # the basis orthonormal are given by B=S^{-1/2}
-        S = np.zeros((n_max, n_max), dtype=np.float64)
-        for i in range(1, n_max + 1):
-            for j in range(1, n_max + 1):
-                S[i - 1, j - 1] = (2 * (r_cut) ** (7 + i + j)) / (
-                    (5 + i + j) * (6 + i + j) * (7 + i + j)
-                )
-
-        # Get the beta factors that orthonormalize the set with Löwdin
-        # orthonormalization
-        betas = sqrtm(np.linalg.inv(S))
-
-        # If the result is complex, the calculation is currently halted.
-        if betas.dtype == np.complex128:
-            raise ValueError(
-                "Could not calculate normalization factors for the radial "
-                "basis in the domain of real numbers. Lowering the number of "
-                "radial basis functions (n_max) or increasing the radial "
-                "cutoff (r_cut) is advised."
-            )
+        return _get_basis_poly(float(r_cut), int(n_max))
+
+
+class SoapContext:
+    """Precalculated data of a single system for repeated evaluations with a
+    :class:`.SOAP` descriptor. Should be created with :meth:`.SOAP.context`.
+
+    Attributes:
+        positions (np.ndarray): Cartesian positions of the atoms.
+        atomic_numbers (np.ndarray): Atomic numbers of the atoms.
+        neighbour_positions (np.ndarray): Positions of the atoms including the
+            periodic copies that are within the cutoff.
+        neighbour_atomic_numbers (np.ndarray): Atomic numbers of the atoms in
+            neighbour_positions.
+        cell_list: The cell list used for finding the neighbours of the
+            centers.
+        key (tuple): The descriptor settings that the context was created for.
+    """
 
-        # The radial basis is integrated in a very specific nonlinearly spaced
-        # grid given by rx
-        x = np.zeros(100)
-        x[0] = -0.999713726773441234
-        x[1] = -0.998491950639595818
-        x[2] = -0.996295134733125149
-        x[3] = -0.99312493703744346
-        x[4] = -0.98898439524299175
-        x[5] = -0.98387754070605702
-        x[6] = -0.97780935848691829
-        x[7] = -0.97078577576370633
-        x[8] = -0.962813654255815527
-        x[9] = -0.95390078292549174
-        x[10] = -0.94405587013625598
-        x[11] = -0.933288535043079546
-        x[12] = -0.921609298145333953
-        x[13] = -0.90902957098252969
-        x[14] = -0.895561644970726987
-        x[15] = -0.881218679385018416
-        x[16] = -0.86601468849716462
-        x[17] = -0.849964527879591284
-        x[18] = -0.833083879888400824
-        x[19] = -0.815389238339176254
-        x[20] = -0.79689789239031448
-        x[21] = -0.77762790964949548
-        x[22] = -0.757598118519707176
-        x[23] = -0.736828089802020706
-        x[24] = -0.715338117573056447
-        x[25] = -0.69314919935580197
-        x[26] = -0.670283015603141016
-        x[27] = -0.64676190851412928
-        x[28] = -0.622608860203707772
-        x[29] = -0.59784747024717872
-        x[30] = -0.57250193262138119
-        x[31] = -0.546597012065094168
-        x[32] = -0.520158019881763057
-        x[33] = -0.493210789208190934
-        x[34] = -0.465781649773358042
-        x[35] = -0.437897402172031513
-        x[36] = -0.409585291678301543
-        x[37] = -0.380872981624629957
-        x[38] = -0.351788526372421721
-        x[39] = -0.322360343900529152
-        x[40] = -0.292617188038471965
-        x[41] = -0.26258812037150348
-        x[42] = -0.23230248184497397
-        x[43] = -0.201789864095735997
-        x[44] = -0.171080080538603275
-        x[45] = -0.140203137236113973
-        x[46] = -0.109189203580061115
-        x[47] = -0.0780685828134366367
-        x[48] = -0.046871682421591632
-        x[49] = -0.015628984421543083
-        x[50] = 0.0156289844215430829
-        x[51] = 0.046871682421591632
-        x[52] = 0.078068582813436637
-        x[53] = 0.109189203580061115
-        x[54] = 0.140203137236113973
-        x[55] = 0.171080080538603275
-        x[56] = 0.201789864095735997
-        x[57] = 0.23230248184497397
-        x[58] = 0.262588120371503479
-        x[59] = 0.292617188038471965
-        x[60] = 0.322360343900529152
-        x[61] = 0.351788526372421721
-        x[62] = 0.380872981624629957
-        x[63] = 0.409585291678301543
-        x[64] = 0.437897402172031513
-        x[65] = 0.465781649773358042
-        x[66] = 0.49321078920819093
-        x[67] = 0.520158019881763057
-        x[68] = 0.546597012065094168
-        x[69] = 0.572501932621381191
-        x[70] = 0.59784747024717872
-        x[71] = 0.622608860203707772
-        x[72] = 0.64676190851412928
-        x[73] = 0.670283015603141016
-        x[74] = 0.693149199355801966
-        x[75] = 0.715338117573056447
-        x[76] = 0.736828089802020706
-        x[77] = 0.75759811851970718
-        x[78] = 0.77762790964949548
-        x[79] = 0.79689789239031448
-        x[80] = 0.81538923833917625
-        x[81] = 0.833083879888400824
-        x[82] = 0.849964527879591284
-        x[83] = 0.866014688497164623
-        x[84] = 0.881218679385018416
-        x[85] = 0.89556164497072699
-        x[86] = 0.90902957098252969
-        x[87] = 0.921609298145333953
-        x[88] = 0.933288535043079546
-        x[89] = 0.94405587013625598
-        x[90] = 0.953900782925491743
-        x[91] = 0.96281365425581553
-        x[92] = 0.970785775763706332
-        x[93] = 0.977809358486918289
-        x[94] = 0.983877540706057016
-        x[95] = 0.98898439524299175
-        x[96] = 0.99312493703744346
-        x[97] = 0.99629513473312515
-        x[98] = 0.998491950639595818
-        x[99] = 0.99971372677344123
-
-        rx = r_cut * 0.5 * (x + 1)
-
-        # Calculate the value of the orthonormalized polynomial basis at the rx
-        # values
-        fs = np.zeros([n_max, len(x)])
-        for n in range(1, n_max + 1):
-            fs[n - 1, :] = (r_cut - np.clip(rx, 0, r_cut)) ** (n + 2)
-
-        gss = np.dot(betas, fs)
-
-        return rx, gss
+    def __init__(
+        self,
+        positions,
+        atomic_numbers,
+        neighbour_positions,
+        neighbour_atomic_numbers,
+        cell_list,
+        key,
+    ):
+        self.positions = positions
+        self.atomic_numbers = atomic_numbers
+        self.neighbour_positions = neighbour_positions
+        self.neighbour_atomic_numbers = neighbour_atomic_numbers
+        self.cell_list = cell_list
+        self.key = key
+
+    def __len__(self):
+        return len(self.positions)
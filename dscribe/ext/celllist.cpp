@@ -78,11 +78,11 @@ void CellList::init() {
     this->dy = max(this->cutoff, (this->ymax - this->ymin)/this->ny);
     this->dz = max(this->cutoff, (this->zmax - this->zmin)/this->nz);
 
-    // Initialize the bin data structure. It is a 4D vector.
-    this->bins = vector<vector<vector<vector<int>>>>(this->nx, vector<vector<vector<int>>>(this->ny, vector<vector<int>>(this->nz, vector<int>())));
-
-    // Fill the bins with atom indices
-    for (ssize_t idx = 0; idx < this->positions.shape(0); idx++) {
+    // Count the atoms in each bin
+    int nAtoms = this->positions.shape(0);
+    vector<int> atomBins(nAtoms);
+    this->binOffsets = vector<int>(this->nx*this->ny*this->nz + 1, 0);
+    for (int idx = 0; idx < nAtoms; idx++) {
         double x = this->positions(idx, 0);
         double y = this->positions(idx, 1);
         double z = this->positions(idx, 2);
@@ -91,9 +91,19 @@ void CellList::init() {
         int i = (x - this->xmin)/this->dx;
         int j = (y - this->ymin)/this->dy;
         int k = (z - this->zmin)/this->dz;
+        int bin = (i*this->ny + j)*this->nz + k;
+        atomBins[idx] = bin;
+        this->binOffsets[bin + 1]++;
+    };
 
-        // Add atom index to the bin
-        this->bins[i][j][k].push_back(idx);
+    // Fill the bins with atom indices
+    for (size_t bin = 1; bin < this->binOffsets.size(); bin++) {
+        this->binOffsets[bin] += this->binOffsets[bin - 1];
+    }
+    vector<int> fill(this->binOffsets.begin(), this->binOffsets.end() - 1);
+    this->binAtoms = vector<int>(nAtoms);
+    for (int idx = 0; idx < nAtoms; idx++) {
+        this->binAtoms[fill[atomBins[idx]]++] = idx;
     };
 }
 
@@ -123,8 +133,9 @@ CellListResult CellList::getNeighboursForPosition(const double x, const double y
             for (int k = kstart; k <= kend; k++){
 
                 // For each atom in the current bin, calculate the actual distance
-                vector<int> binIndices = this->bins[i][j][k];
-                for (auto &idx : binIndices) {
+                int bin = (i*this->ny + j)*this->nz + k;
+                for (int b = this->binOffsets[bin]; b < this->binOffsets[bin + 1]; b++) {
+                    int idx = this->binAtoms[b];
                     double ix = this->positions(idx, 0);
                     double iy = this->positions(idx, 1);
                     double iz = this->positions(idx, 2);
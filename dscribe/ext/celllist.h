@@ -80,7 +80,12 @@ class CellList {
         int nx;
         int ny;
         int nz;
-        vector<vector<vector<vector<int>>>> bins;
+        // The atom indices sorted by bin. The atoms in the bin (i, j, k) are
+        // stored in binAtoms[binOffsets[b]:binOffsets[b+1]], where
+        // b = (i*ny + j)*nz + k. Compared to nested vectors this keeps the
+        // lookups contiguous and makes copying the cell list cheap.
+        vector<int> binOffsets;
+        vector<int> binAtoms;
 };
 
 #endif
@@ -56,18 +56,21 @@ PYBIND11_MODULE(ext, m) {
 
     // SOAP
     py::class_<SOAPGTO>(m, "SOAPGTO")
-        .def(py::init<double, int, int, double, py::dict, bool, string, double, py::array_t<double>, py::array_t<double>, py::array_t<int>, bool>())
+        .def(py::init<double, int, int, double, py::dict, bool, string, double, py::array_t<double>, py::array_t<double>, py::array_t<int>, bool, double>())
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double> >()(&SOAPGTO::create, py::const_))
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double>, py::array_t<bool>, py::array_t<double> >()(&SOAPGTO::create, py::const_))
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double>, CellList>()(&SOAPGTO::create, py::const_))
         .def("derivatives_numerical", &SOAPGTO::derivatives_numerical)
-        .def("derivatives_analytical", &SOAPGTO::derivatives_analytical);
+        .def("derivatives_analytical", &SOAPGTO::derivatives_analytical<double>)
+        .def("derivatives_analytical", &SOAPGTO::derivatives_analytical<float>);
     py::class_<SOAPPolynomial>(m, "SOAPPolynomial")
         .def(py::init<double, int, int, double, py::dict, bool, string, double, py::array_t<double>, py::array_t<double>, py::array_t<int>, bool >())
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double> >()(&SOAPPolynomial::create, py::const_))
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double>, py::array_t<bool>, py::array_t<double> >()(&SOAPPolynomial::create, py::const_))
         .def("create", overload_cast_<py::array_t<double>, py::array_t<double>, py::array_t<int>, py::array_t<double>, CellList>()(&SOAPPolynomial::create, py::const_))
-        .def("derivatives_numerical", &SOAPPolynomial::derivatives_numerical);
+        .def("derivatives_numerical", &SOAPPolynomial::derivatives_numerical)
+        .def("derivatives_analytical", &SOAPPolynomial::derivatives_analytical<double>)
+        .def("derivatives_analytical", &SOAPPolynomial::derivatives_analytical<float>);
 
     // ACSF
     py::class_<ACSF>(m, "ACSFWrapper")
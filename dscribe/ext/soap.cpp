@@ -31,7 +31,8 @@ SOAPGTO::SOAPGTO(
     py::array_t<double> alphas,
     py::array_t<double> betas,
     py::array_t<int> species,
-    bool periodic
+    bool periodic,
+    double radial_grid
 )
     : Descriptor(periodic, average, rcut+cutoff_padding)
     , rcut(rcut)
@@ -41,10 +42,24 @@ SOAPGTO::SOAPGTO(
     , weighting(weighting)
     , crossover(crossover)
     , cutoff_padding(cutoff_padding)
-    , alphas(alphas)
-    , betas(betas)
     , species(species)
+    , radial_grid(radial_grid)
+    , exp_table(getExpTableD(alphas, nmax, lmax, eta, rcut+cutoff_padding, radial_grid))
+    , aoa((lmax+1)*nmax)
+    , boa((lmax+1)*nmax*nmax)
 {
+    double oOeta = 1.0/eta;
+    double oOeta3O2 = sqrt(oOeta*oOeta*oOeta);
+    getAlphaBetaD(
+        this->aoa.mutable_data(),
+        this->boa.mutable_data(),
+        (double*)alphas.request().ptr,
+        (double*)betas.request().ptr,
+        nmax,
+        lmax,
+        oOeta,
+        oOeta3O2
+    );
 }
 
 void SOAPGTO::create(
@@ -104,8 +119,8 @@ void SOAPGTO::create(
         positions,
         centers,
         center_indices,
-        this->alphas,
-        this->betas,
+        this->aoa,
+        this->boa,
         atomic_numbers,
         this->species,
         this->rcut,
@@ -113,6 +128,8 @@ void SOAPGTO::create(
         this->nmax,
         this->lmax,
         this->eta,
+        this->radial_grid,
+        this->exp_table,
         this->weighting,
         this->crossover,
         this->average,
@@ -132,12 +149,13 @@ int SOAPGTO::get_number_of_features() const
         : n_species*(this->lmax+1)*((this->nmax+1)*this->nmax)/2;
 }
 
+template <typename T>
 void SOAPGTO::derivatives_analytical(
     py::array_t<double> derivatives,
     py::array_t<double> descriptor,
-    py::array_t<double> xd,
-    py::array_t<double> yd,
-    py::array_t<double> zd,
+    py::array_t<T> xd,
+    py::array_t<T> yd,
+    py::array_t<T> zd,
     py::array_t<double> positions,
     py::array_t<int> atomic_numbers,
     py::array_t<double> cell,
@@ -170,8 +188,8 @@ void SOAPGTO::derivatives_analytical(
         positions,
         centers,
         center_indices,
-        this->alphas,
-        this->betas,
+        this->aoa,
+        this->boa,
         atomic_numbers,
         this->species,
         this->rcut,
@@ -179,6 +197,8 @@ void SOAPGTO::derivatives_analytical(
         this->nmax,
         this->lmax,
         this->eta,
+        this->radial_grid,
+        this->exp_table,
         this->weighting,
         this->crossover,
         this->average,
@@ -190,6 +210,40 @@ void SOAPGTO::derivatives_analytical(
     );
 }
 
+template void SOAPGTO::derivatives_analytical<double>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<double> xd,
+    py::array_t<double> yd,
+    py::array_t<double> zd,
+    py::array_t<double> positions,
+    py::array_t<int> atomic_numbers,
+    py::array_t<double> cell,
+    py::array_t<bool> pbc,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor
+) const;
+
+template void SOAPGTO::derivatives_analytical<float>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<float> xd,
+    py::array_t<float> yd,
+    py::array_t<float> zd,
+    py::array_t<double> positions,
+    py::array_t<int> atomic_numbers,
+    py::array_t<double> cell,
+    py::array_t<bool> pbc,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor
+) const;
+
 SOAPPolynomial::SOAPPolynomial(
     double rcut,
     int nmax,
@@ -258,10 +312,23 @@ void SOAPPolynomial::create(
     CellList cell_list
 ) const
 {
+    // Empty mock arrays since we are not calculating the derivatives
+    py::array_t<double> xd({1, 1, 1, 1, 1});
+    py::array_t<double> yd({1, 1, 1, 1, 1});
+    py::array_t<double> zd({1, 1, 1, 1, 1});
+    py::array_t<double> derivatives({1, 1, 1, 1});
+    py::array_t<int> indices({1});
+    py::array_t<int> center_indices({1});
+
     soapGeneral(
+        derivatives,
         out,
+        xd,
+        yd,
+        zd,
         positions,
         centers,
+        center_indices,
         atomic_numbers,
         this->species,
         this->rcut,
@@ -274,6 +341,10 @@ void SOAPPolynomial::create(
         this->gss,
         this->crossover,
         this->average,
+        indices,
+        false,
+        true,
+        false,
         cell_list
     );
 }
@@ -285,3 +356,96 @@ int SOAPPolynomial::get_number_of_features() const
         ? (n_species*this->nmax)*(n_species*this->nmax+1)/2*(this->lmax+1) 
         : n_species*(this->lmax+1)*((this->nmax+1)*this->nmax)/2;
 }
+
+template <typename T>
+void SOAPPolynomial::derivatives_analytical(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<T> xd,
+    py::array_t<T> yd,
+    py::array_t<T> zd,
+    py::array_t<double> positions,
+    py::array_t<int> atomic_numbers,
+    py::array_t<double> cell,
+    py::array_t<bool> pbc,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor
+) const
+{
+    // Extend system if periodicity is requested.
+    auto pbc_u = pbc.unchecked<1>();
+    bool is_periodic = this->periodic && (pbc_u(0) || pbc_u(1) || pbc_u(2));
+    if (is_periodic) {
+        ExtendedSystem system_extended = extend_system(positions, atomic_numbers, cell, pbc, this->cutoff);
+        positions = system_extended.positions;
+        atomic_numbers = system_extended.atomic_numbers;
+    }
+
+    // Calculate neighbours with a cell list
+    CellList cell_list(positions, this->cutoff);
+
+    soapGeneral(
+        derivatives,
+        descriptor,
+        xd,
+        yd,
+        zd,
+        positions,
+        centers,
+        center_indices,
+        atomic_numbers,
+        this->species,
+        this->rcut,
+        this->cutoff_padding,
+        this->nmax,
+        this->lmax,
+        this->eta,
+        this->weighting,
+        this->rx,
+        this->gss,
+        this->crossover,
+        this->average,
+        indices,
+        attach,
+        return_descriptor,
+        true,
+        cell_list
+    );
+}
+
+template void SOAPPolynomial::derivatives_analytical<double>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<double> xd,
+    py::array_t<double> yd,
+    py::array_t<double> zd,
+    py::array_t<double> positions,
+    py::array_t<int> atomic_numbers,
+    py::array_t<double> cell,
+    py::array_t<bool> pbc,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor
+) const;
+
+template void SOAPPolynomial::derivatives_analytical<float>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<float> xd,
+    py::array_t<float> yd,
+    py::array_t<float> zd,
+    py::array_t<double> positions,
+    py::array_t<int> atomic_numbers,
+    py::array_t<double> cell,
+    py::array_t<bool> pbc,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor
+) const;
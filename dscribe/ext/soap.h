@@ -44,7 +44,8 @@ class SOAPGTO: public Descriptor {
             py::array_t<double> alphas,
             py::array_t<double> betas,
             py::array_t<int> species,
-            bool periodic
+            bool periodic,
+            double radial_grid
         );
         /**
          * For creating SOAP output.
@@ -79,14 +80,16 @@ class SOAPGTO: public Descriptor {
         int get_number_of_features() const;
 
         /**
-         * Analytical derivatives.
+         * Analytical derivatives. The derivatives of the coefficients (xd, yd,
+         * zd) can be stored in single or double precision.
          */
+        template <typename T>
         void derivatives_analytical(
             py::array_t<double> derivatives,
             py::array_t<double> descriptor,
-            py::array_t<double> xd,
-            py::array_t<double> yd,
-            py::array_t<double> zd,
+            py::array_t<T> xd,
+            py::array_t<T> yd,
+            py::array_t<T> zd,
             py::array_t<double> positions,
             py::array_t<int> atomic_numbers,
             py::array_t<double> cell,
@@ -106,9 +109,14 @@ class SOAPGTO: public Descriptor {
         const py::dict weighting;
         const bool crossover;
         const double cutoff_padding;
-        const py::array_t<double> alphas;
-        const py::array_t<double> betas;
         const py::array_t<int> species;
+        const double radial_grid;
+        const py::array_t<double> exp_table;
+        // The GTO exponents and coefficients after the integration over the
+        // gaussian atomic densities. These only depend on the basis and are
+        // thus calculated once. Laid out as [l][k] and [l][n][k].
+        py::array_t<double> aoa;
+        py::array_t<double> boa;
 };
 
 /**
@@ -165,6 +173,28 @@ class SOAPPolynomial: public Descriptor {
          */
         int get_number_of_features() const;
 
+        /**
+         * Analytical derivatives. The derivatives of the coefficients (xd, yd,
+         * zd) can be stored in single or double precision.
+         */
+        template <typename T>
+        void derivatives_analytical(
+            py::array_t<double> derivatives,
+            py::array_t<double> descriptor,
+            py::array_t<T> xd,
+            py::array_t<T> yd,
+            py::array_t<T> zd,
+            py::array_t<double> positions,
+            py::array_t<int> atomic_numbers,
+            py::array_t<double> cell,
+            py::array_t<bool> pbc,
+            py::array_t<double> centers,
+            py::array_t<int> center_indices,
+            py::array_t<int> indices,
+            const bool attach,
+            const bool return_descriptor
+        ) const;
+
     private:
         const double rcut;
         const int nmax;
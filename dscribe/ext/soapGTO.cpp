@@ -24,11 +24,17 @@ limitations under the License.
 #include "soapGTO.h"
 #include "celllist.h"
 #include "weighting.h"
+#include <Eigen/Dense>
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
 
 #define PI2 9.86960440108936
 #define PI 3.141592653589793238
 #define PI3 31.00627668029982 
 #define PIHalf 1.57079632679490
+
+using namespace Eigen;
 //===========================================================
 inline int getCrosNumD(int n)
 {
@@ -105,6 +111,113 @@ void getAlphaBetaD(double* aOa, double* bOa, double* alphas, double* betas, int
   }
 }
 //================================================================
+/**
+ * Returns the sum over the neighbours of a[i]*b[i]. With AVX2 four neighbours
+ * are processed per iteration and the lanes are only reduced at the end.
+ * Otherwise four independent partial sums are used, which the compiler can
+ * vectorize without reordering a single accumulation chain.
+ */
+inline double sumProductD(const double* a, const double* b, int size) {
+  int i = 0;
+#ifdef __AVX2__
+  __m256d acc = _mm256_setzero_pd();
+  for (; i + 4 <= size; i += 4) {
+    acc = _mm256_fmadd_pd(_mm256_loadu_pd(a + i), _mm256_loadu_pd(b + i), acc);
+  }
+  __m128d half = _mm_add_pd(_mm256_castpd256_pd128(acc), _mm256_extractf128_pd(acc, 1));
+  double sum = _mm_cvtsd_f64(_mm_hadd_pd(half, half));
+#else
+  double acc0 = 0, acc1 = 0, acc2 = 0, acc3 = 0;
+  for (; i + 4 <= size; i += 4) {
+    acc0 += a[i]*b[i];
+    acc1 += a[i+1]*b[i+1];
+    acc2 += a[i+2]*b[i+2];
+    acc3 += a[i+3]*b[i+3];
+  }
+  double sum = (acc0 + acc1) + (acc2 + acc3);
+#endif
+  for (; i < size; i++) {
+    sum += a[i]*b[i];
+  }
+  return sum;
+}
+//================================================================
+/**
+ * Returns the sum over the neighbours of a[i], see sumProductD.
+ */
+inline double sumD(const double* a, int size) {
+  int i = 0;
+#ifdef __AVX2__
+  __m256d acc = _mm256_setzero_pd();
+  for (; i + 4 <= size; i += 4) {
+    acc = _mm256_add_pd(_mm256_loadu_pd(a + i), acc);
+  }
+  __m128d half = _mm_add_pd(_mm256_castpd256_pd128(acc), _mm256_extractf128_pd(acc, 1));
+  double sum = _mm_cvtsd_f64(_mm_hadd_pd(half, half));
+#else
+  double acc0 = 0, acc1 = 0, acc2 = 0, acc3 = 0;
+  for (; i + 4 <= size; i += 4) {
+    acc0 += a[i];
+    acc1 += a[i+1];
+    acc2 += a[i+2];
+    acc3 += a[i+3];
+  }
+  double sum = (acc0 + acc1) + (acc2 + acc3);
+#endif
+  for (; i < size; i++) {
+    sum += a[i];
+  }
+  return sum;
+}
+//================================================================
+/**
+ * Tabulates the one-dimensional Gaussians exp(aOa*x^2) for each (l, k) pair on
+ * a uniform grid x = 0, radialGrid, 2*radialGrid, ... that covers the given
+ * cutoff. As the Gaussian factorizes over the Cartesian axes, exp(aOa*r^2) can
+ * then be assembled from three lookups of this table. An empty table is
+ * returned if radialGrid is zero, in which case the exponentials are evaluated
+ * exactly.
+ */
+py::array_t<double> getExpTableD(py::array_t<double> alphasArr, int Ns, int lMax, double eta, double cutoff, double radialGrid) {
+  if (radialGrid <= 0) {
+    return py::array_t<double>(vector<py::ssize_t>{0, 0});
+  }
+  auto alphas = alphasArr.unchecked<1>();
+  const int nGrid = (int)(cutoff/radialGrid) + 2;
+  py::array_t<double> table({(lMax+1)*Ns, nGrid});
+  auto table_mu = table.mutable_unchecked<2>();
+  double oOeta = 1.0/eta;
+  for (int lk = 0; lk < (lMax+1)*Ns; lk++) {
+    double aOa = -alphas(lk)/(1.0 + oOeta*alphas(lk));
+    for (int g = 0; g < nGrid; g++) {
+      double x = g*radialGrid;
+      table_mu(lk, g) = exp(aOa*x*x);
+    }
+  }
+  return table;
+}
+//================================================================
+/**
+ * Calculates exp(aOa*r^2) for all neighbours. If a table from getExpTableD is
+ * given, the value is the product of the tabulated one-dimensional Gaussians
+ * at the closest grid points along x, y and z. Otherwise the exponential is
+ * evaluated directly.
+ */
+inline void getExponentialsD(double* expValues, const double aOa, const double* table, const double oOgrid, double* x, double* y, double* z, double* r2, int Asize) {
+  if (table == nullptr) {
+    for (int i = 0; i < Asize; i++) {
+      expValues[i] = exp(aOa*r2[i]);
+    }
+  } else {
+    for (int i = 0; i < Asize; i++) {
+      int ix = (int)(fabs(x[i])*oOgrid + 0.5);
+      int iy = (int)(fabs(y[i])*oOgrid + 0.5);
+      int iz = (int)(fabs(z[i])*oOgrid + 0.5);
+      expValues[i] = table[ix]*table[iy]*table[iz];
+    }
+  }
+}
+//================================================================
 void getCfactorsD(double* preCoef, double* prCofDX, double* prCofDY, double* prCofDZ, int Asize, double* x,double* x2, double* x4, double* x6, double* x8, double* x10,double* x12,double* x14,double* x16,double* x18, double* y,double* y2, double* y4, double* y6, double* y8, double* y10,double* y12,double* y14,double* y16,double* y18, double* z, double* z2, double* z4, double* z6, double* z8, double* z10,double* z12,double* z14,double* z16,double* z18, double* r2, double* r4, double* r6, double* r8,double* r10,double* r12,double* r14,double* r16,double* r18, double* r20,  double* x20,  double* y20,  double* z20, int totalAN, int lMax, bool return_derivatives){
 
   for (int i = 0; i < Asize; i++) {
@@ -1980,10 +2093,11 @@ prCofDZ[totalAN*436+i] = 0 ;
   }
 }}
 //==============================================================================================================================
+template <typename T>
 void getCD(
-    py::detail::unchecked_mutable_reference<double, 5> &CDevX_mu,
-    py::detail::unchecked_mutable_reference<double, 5> &CDevY_mu,
-    py::detail::unchecked_mutable_reference<double, 5> &CDevZ_mu,
+    py::detail::unchecked_mutable_reference<T, 5> &CDevX_mu,
+    py::detail::unchecked_mutable_reference<T, 5> &CDevY_mu,
+    py::detail::unchecked_mutable_reference<T, 5> &CDevZ_mu,
     double* prCofDX,
     double* prCofDY,
     double* prCofDZ,
@@ -1996,6 +2110,9 @@ void getCD(
     double* weights,
     double* bOa,
     double* aOa,
+    const double* expTable,
+    const int nGrid,
+    const double oOgrid,
     double* exes,
     int totalAN,
     int Asize,
@@ -2015,65 +2132,52 @@ void getCD(
   int LNs;
   double preExp;
   double preVal;
-  double preValX;
-  double preValY;
-  double preValZ;
 
   double  preVal1;
   double  preVal2;
   double  preVal3;
-    
-  double  preValX1;
-  double  preValY1;
-  double  preValZ1;
-
-  double  preValX2;
-  double  preValY2;
-  double  preValZ2;
-
-  double  preValX3;
-  double  preValY3;
-  double  preValZ3;
   double* preExponentArray = (double*) malloc(Ns*Asize*sizeof(double));
 
   // l=0-------------------------------------------------------------------------------------------------
   int shift = 0;
   for (int k = 0; k < Ns; k++) {
+    getExponentialsD(&preExponentArray[shift], aOa[k], expTable ? expTable + k*nGrid : nullptr, oOgrid, x, y, z, r2, Asize);
     for (int i = 0; i < Asize; i++) {
-      preExponentArray[shift] = weights[i]*1.5707963267948966*exp(aOa[k]*r2[i]);
+      preExponentArray[shift] *= weights[i]*1.5707963267948966;
       shift++;
     }
   }
 
-  shift = 0;
   for (int k = 0; k < Ns; k++) {
-    sumMe = 0;
-    for (int i = 0; i < Asize; i++) {
-      preExp = preExponentArray[shift];
-      sumMe += preExp;
-      shift++;
-    }
+    sumMe = sumD(&preExponentArray[Asize*k], Asize);
     for (int n = 0; n < Ns; n++) {
       C_mu(posI, typeJ, n, 0) += bOa[n*Ns + k]*sumMe;
     } 
   }
 
-  shift = 0;
+  // The derivatives of the primitive gaussians are first gathered for all k
+  // and then contracted with the betas, so that each element of the
+  // derivative arrays is only updated once per neighbour.
+  double* dPrimX;
+  double* dPrimY;
+  double* dPrimZ;
   if (return_derivatives) {
-    for (int k = 0; k < Ns; k++) {
-      for (int i = 0; i < Asize; i++) {
-        preExp = preExponentArray[shift];
-        shift++;
+    dPrimX = (double*) malloc(3*Ns*sizeof(double));
+    dPrimY = (double*) malloc(3*Ns*sizeof(double));
+    dPrimZ = (double*) malloc(3*Ns*sizeof(double));
+    for (int i = 0; i < Asize; i++) {
+      for (int k = 0; k < Ns; k++) {
+        preExp = preExponentArray[Asize*k + i];
         preVal = 2.0*aOa[k]*preExp;
-        preValX = preVal*x[i];
-        preValY = preVal*y[i];
-        preValZ = preVal*z[i];
-        for (int n = 0; n < Ns; n++) {
-          CDevX_mu(indices[i], posI, typeJ, n, 0) += bOa[n*Ns + k]*preValX;
-          CDevY_mu(indices[i], posI, typeJ, n, 0) += bOa[n*Ns + k]*preValY;
-          CDevZ_mu(indices[i], posI, typeJ, n, 0) += bOa[n*Ns + k]*preValZ;
-        }
-      } 
+        dPrimX[k] = preVal*x[i];
+        dPrimY[k] = preVal*y[i];
+        dPrimZ[k] = preVal*z[i];
+      }
+      for (int n = 0; n < Ns; n++) {
+        CDevX_mu(indices[i], posI, typeJ, n, 0) += sumProductD(&bOa[n*Ns], dPrimX, Ns);
+        CDevY_mu(indices[i], posI, typeJ, n, 0) += sumProductD(&bOa[n*Ns], dPrimY, Ns);
+        CDevZ_mu(indices[i], posI, typeJ, n, 0) += sumProductD(&bOa[n*Ns], dPrimZ, Ns);
+      }
     }
   }
 
@@ -2084,27 +2188,20 @@ void getCD(
 
     shift = 0 ;
     for (int k = 0; k < Ns; k++) {
+      getExponentialsD(&preExponentArray[shift], aOa[LNs + k], expTable ? expTable + (LNs + k)*nGrid : nullptr, oOgrid, x, y, z, r2, Asize);
       for (int i = 0; i < Asize; i++) {
-        preExponentArray[shift] = weights[i]*2.7206990463849543*exp(aOa[LNs + k]*r2[i]);
+        preExponentArray[shift] *= weights[i]*2.7206990463849543;
         shift++;
       }
     }
     
-    shift = 0 ;
     double sumMe1;
     double sumMe2;
     double sumMe3;
     for (int k = 0; k < Ns; k++) {
-    sumMe1 = 0;
-    sumMe2 = 0;
-    sumMe3 = 0;
-      for (int i = 0; i < Asize; i++) {
-        preExp = preExponentArray[shift];
-        sumMe1 += preExp*z[i];
-        sumMe2 += preExp*x[i];
-        sumMe3 += preExp*y[i];
-        shift++;
-      }
+      sumMe1 = sumProductD(&preExponentArray[Asize*k], z, Asize);
+      sumMe2 = sumProductD(&preExponentArray[Asize*k], x, Asize);
+      sumMe3 = sumProductD(&preExponentArray[Asize*k], y, Asize);
       for (int n = 0; n < Ns; n++) {
         C_mu(posI, typeJ, n, 1) += bOa[LNsNs + n*Ns + k]*sumMe1;
         C_mu(posI, typeJ, n, 2) += bOa[LNsNs + n*Ns + k]*sumMe2;
@@ -2113,41 +2210,31 @@ void getCD(
     }
 
     if (return_derivatives) {
-      shift = 0;
-      for (int k = 0; k < Ns; k++) {
-        for (int i = 0; i < Asize; i++) {
-          preExp = preExponentArray[shift];
-          shift++;
+      for (int i = 0; i < Asize; i++) {
+        for (int k = 0; k < Ns; k++) {
+          preExp = preExponentArray[Asize*k + i];
           preVal = 2.0*aOa[LNs + k]*preExp;
-          if (return_derivatives) {
-            preVal1 = preVal*z[i];
-            preVal2 = preVal*x[i];
-            preVal3 = preVal*y[i];
-           
-            preValX1 = preVal1*x[i];
-            preValY1 = preVal1*y[i];
-            preValZ1 = preVal1*z[i] + preExp;
-
-            preValX2 = preVal2*x[i] + preExp;
-            preValY2 = preVal2*y[i];
-            preValZ2 = preVal2*z[i];
-
-            preValX3 = preVal3*x[i];
-            preValY3 = preVal3*y[i] + preExp;
-            preValZ3 = preVal3*z[i];
-          }
-          for (int n = 0; n < Ns; n++) {
-            CDevX_mu(indices[i], posI, typeJ, n, 1) += bOa[LNsNs + n*Ns + k]*preValX1;
-            CDevY_mu(indices[i], posI, typeJ, n, 1) += bOa[LNsNs + n*Ns + k]*preValY1;
-            CDevZ_mu(indices[i], posI, typeJ, n, 1) += bOa[LNsNs + n*Ns + k]*preValZ1;
+          preVal1 = preVal*z[i];
+          preVal2 = preVal*x[i];
+          preVal3 = preVal*y[i];
 
-            CDevX_mu(indices[i], posI, typeJ, n, 2) += bOa[LNsNs + n*Ns + k]*preValX2;
-            CDevY_mu(indices[i], posI, typeJ, n, 2) += bOa[LNsNs + n*Ns + k]*preValY2;
-            CDevZ_mu(indices[i], posI, typeJ, n, 2) += bOa[LNsNs + n*Ns + k]*preValZ2;
+          dPrimX[k] = preVal1*x[i];
+          dPrimY[k] = preVal1*y[i];
+          dPrimZ[k] = preVal1*z[i] + preExp;
 
-            CDevX_mu(indices[i], posI, typeJ, n, 3) += bOa[LNsNs + n*Ns + k]*preValX3;
-            CDevY_mu(indices[i], posI, typeJ, n, 3) += bOa[LNsNs + n*Ns + k]*preValY3;
-            CDevZ_mu(indices[i], posI, typeJ, n, 3) += bOa[LNsNs + n*Ns + k]*preValZ3;
+          dPrimX[Ns + k] = preVal2*x[i] + preExp;
+          dPrimY[Ns + k] = preVal2*y[i];
+          dPrimZ[Ns + k] = preVal2*z[i];
+
+          dPrimX[2*Ns + k] = preVal3*x[i];
+          dPrimY[2*Ns + k] = preVal3*y[i] + preExp;
+          dPrimZ[2*Ns + k] = preVal3*z[i];
+        }
+        for (int n = 0; n < Ns; n++) {
+          for (int m = 1; m < 4; m++) {
+            CDevX_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], &dPrimX[(m-1)*Ns], Ns);
+            CDevY_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], &dPrimY[(m-1)*Ns], Ns);
+            CDevZ_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], &dPrimZ[(m-1)*Ns], Ns);
           }
         }
       }
@@ -2163,23 +2250,17 @@ void getCD(
       LNsNs=restOfLs*NsNs; LNs=restOfLs*Ns; 
       shift = 0;
       for (int k = 0; k < Ns; k++) {
+        getExponentialsD(&preExponentArray[shift], aOa[LNs + k], expTable ? expTable + (LNs + k)*nGrid : nullptr, oOgrid, x, y, z, r2, Asize);
         for (int i = 0; i < Asize; i++) {
-          double expSholder = aOa[LNs + k]*r2[i];
-          preExponentArray[shift] = weights[i]*exp(expSholder);
+          preExponentArray[shift] *= weights[i];
           shift++;
         }
       }
 
       //double*  sumS = (double*) malloc(sizeof(double)*(restOfLs+1)*(restOfLs+1))
-      shift = 0;
       for (int k = 0; k < Ns; k++) {
         for (int m = restOfLs*restOfLs; m < (restOfLs+1)*(restOfLs+1); m++) {
-          sumMe = 0;
-          for (int i = 0; i < Asize; i++) {
-            preExp = preExponentArray[Asize*k+i];
-            sumMe += preExp*preCoef[totalAN*(m-4)+i];
-            shift++;
-          }
+          sumMe = sumProductD(&preExponentArray[Asize*k], &preCoef[totalAN*(m-4)], Asize);
           for (int n = 0; n < Ns; n++) {
             C_mu(posI, typeJ, n, m) += bOa[LNsNs + n*Ns + k]*sumMe;
           }
@@ -2187,21 +2268,19 @@ void getCD(
       }
 
       if (return_derivatives) {
-        shift = 0;
-        for (int k = 0; k < Ns; k++) {
-          for (int i = 0; i < Asize; i++) {
-            preExp = preExponentArray[shift];
-            shift++;
-            for (int m = restOfLs*restOfLs; m < (restOfLs+1)*(restOfLs+1); m++) {
+        for (int i = 0; i < Asize; i++) {
+          for (int m = restOfLs*restOfLs; m < (restOfLs+1)*(restOfLs+1); m++) {
+            for (int k = 0; k < Ns; k++) {
+              preExp = preExponentArray[Asize*k + i];
               preVal = 2.0*aOa[LNs + k]*preExp*preCoef[totalAN*(m-4)+i];
-              preValX = x[i]*preVal + preExp*prCofDX[totalAN*(m-4)+i];
-              preValY = y[i]*preVal + preExp*prCofDY[totalAN*(m-4)+i];
-              preValZ = z[i]*preVal + preExp*prCofDZ[totalAN*(m-4)+i];
-              for (int n = 0; n < Ns; n++) {
-                CDevX_mu(indices[i], posI, typeJ, n, m) += bOa[LNsNs + n*Ns + k]*preValX;
-                CDevY_mu(indices[i], posI, typeJ, n, m) += bOa[LNsNs + n*Ns + k]*preValY;
-                CDevZ_mu(indices[i], posI, typeJ, n, m) += bOa[LNsNs + n*Ns + k]*preValZ;
-              }
+              dPrimX[k] = x[i]*preVal + preExp*prCofDX[totalAN*(m-4)+i];
+              dPrimY[k] = y[i]*preVal + preExp*prCofDY[totalAN*(m-4)+i];
+              dPrimZ[k] = z[i]*preVal + preExp*prCofDZ[totalAN*(m-4)+i];
+            }
+            for (int n = 0; n < Ns; n++) {
+              CDevX_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], dPrimX, Ns);
+              CDevY_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], dPrimY, Ns);
+              CDevZ_mu(indices[i], posI, typeJ, n, m) += sumProductD(&bOa[LNsNs + n*Ns], dPrimZ, Ns);
             }
           }
         }
@@ -2209,6 +2288,9 @@ void getCD(
     }
   }
   free(preExponentArray);
+  if (return_derivatives) {
+    free(dPrimX); free(dPrimY); free(dPrimZ);
+  }
 
   // If attach=True, the derivative with respect to the center atom coordinates
   // is the negative sum of derivatives with respect to coordinates of other
@@ -2247,6 +2329,17 @@ void getPD(
   bool crossover
 ) {
 
+    // The coefficients of each center are first gathered into one matrix per
+    // l, with rows (species, n) and columns m. The contraction over m is then
+    // a single matrix product for all pairs of (species, n) at once. Without
+    // crossover only the diagonal species blocks are needed. Species that have
+    // no neighbours around a center have only zero coefficients: they are left
+    // out of the matrices, and their blocks in the zero-initialized output are
+    // skipped.
+    vector<MatrixXd> coeffs(lMax+1);
+    vector<MatrixXd> products(lMax+1);
+    vector<int> rowIndex(Ts);
+
     // The power spectrum is multiplied by an l-dependent prefactor that comes
     // from the normalization of the Wigner D matrices. This prefactor is
     // mentioned in the arrata of the original SOAP paper: On representing
@@ -2254,33 +2347,72 @@ void getPD(
     // root of the prefactor in the dot-product kernel is used, so that after a
     // possible dot-product the full prefactor is recovered.
     for(int i = 0; i < nCenters; i++){
+      int nPresent = 0;
+      for(int j = 0; j < Ts; j++){
+        rowIndex[j] = -1;
+        for(int k = 0; k < Ns && rowIndex[j] < 0; k++){
+          for(int lm = 0; lm < (lMax+1)*(lMax+1); lm++){
+            if (Cnnd_u(i, j, k, lm) != 0) {
+              rowIndex[j] = nPresent*Ns;
+              nPresent++;
+              break;
+            }
+          }
+        }
+      }
+      if (nPresent == 0) {
+        continue;
+      }
+      int nRows = nPresent*Ns;
+      for(int m = 0; m <= lMax; m++){
+        MatrixXd &c = coeffs[m];
+        c.resize(nRows, 2*m+1);
+        for(int j = 0; j < Ts; j++){
+          if (rowIndex[j] < 0) {
+            continue;
+          }
+          for(int k = 0; k < Ns; k++){
+            for(int buffShift = 0; buffShift < 2*m+1; buffShift++){
+              c(rowIndex[j] + k, buffShift) = Cnnd_u(i, j, k, m*m + buffShift);
+            }
+          }
+        }
+        products[m].resize(nRows, nRows);
+        if (crossover) {
+          products[m].noalias() = c*c.transpose();
+        } else {
+          for(int j = 0; j < nPresent; j++){
+            products[m].block(j*Ns, j*Ns, Ns, Ns).noalias() = c.middleRows(j*Ns, Ns)*c.middleRows(j*Ns, Ns).transpose();
+          }
+        }
+      }
       int shiftAll = 0;
       for(int j = 0; j < Ts; j++){
        int jdLimit = crossover ? Ts : j+1;
        for(int jd = j; jd < jdLimit; jd++){
+        int blockSize = j == jd ? Ns*(Ns+1)/2 : Ns*Ns;
+        if (rowIndex[j] < 0 || rowIndex[jd] < 0) {
+          shiftAll += (lMax+1)*blockSize;
+          continue;
+        }
+        int row = rowIndex[j];
+        int col = rowIndex[jd];
         for(int m=0; m <= lMax; m++){
         double prel;
         if(m > 1){prel = PI*sqrt(8.0/(2.0*m+1.0))*PI3;}
         else{prel = PI*sqrt(8.0/(2.0*m+1.0));}
+        const MatrixXd &product = products[m];
          if(j==jd){
           for(int k = 0; k < Ns; k++){
             for(int kd = k; kd < Ns; kd++){
-              double buffDouble = 0;
-              for(int buffShift = m*m; buffShift < (m+1)*(m+1); buffShift++){
-                buffDouble += Cnnd_u(i,j,k,buffShift) * Cnnd_u(i,jd,kd,buffShift);
-  	       }
-              descriptor_mu(i, shiftAll) = prel*buffDouble;
+              descriptor_mu(i, shiftAll) = prel*product(row + k, col + kd);
               shiftAll++;
             }
           }
        } else { 
           for(int k = 0; k < Ns; k++){
             for(int kd = 0; kd < Ns; kd++){
-              double buffDouble = 0;
-              for(int buffShift = m*m; buffShift < (m+1)*(m+1); buffShift++){
-                buffDouble += Cnnd_u(i,j,k,buffShift) * Cnnd_u(i,jd,kd,buffShift);
-  	       }
-              descriptor_mu(i, shiftAll) = prel*buffDouble;
+              descriptor_mu(i, shiftAll) = prel*product(row + k, col + kd);
               shiftAll++;
             }
           }
@@ -2294,14 +2426,15 @@ void getPD(
 /**
  * Used to calculate the partial power spectrum derivatives.
  */
+  template <typename T>
   void getPDev(
     py::detail::unchecked_mutable_reference<double, 4> &derivatives_mu,
     py::detail::unchecked_reference<double, 2> &positions_u,
     py::detail::unchecked_reference<int, 1> &indices_u,
     CellList &cell_list,
-    py::detail::unchecked_reference<double, 5> &CdevX_u,
-    py::detail::unchecked_reference<double, 5> &CdevY_u,
-    py::detail::unchecked_reference<double, 5> &CdevZ_u,
+    py::detail::unchecked_reference<T, 5> &CdevX_u,
+    py::detail::unchecked_reference<T, 5> &CdevY_u,
+    py::detail::unchecked_reference<T, 5> &CdevZ_u,
     py::detail::unchecked_reference<double, 4> &Cnnd_u,
     int Ns,
     int Ts,
@@ -2370,17 +2503,18 @@ void getPD(
   }
 }
 //=================================================================================================================================================================
+template <typename T>
 void soapGTO(
     py::array_t<double> derivatives,
     py::array_t<double> descriptor,
-    py::array_t<double> cdevX,
-    py::array_t<double> cdevY,
-    py::array_t<double> cdevZ,
+    py::array_t<T> cdevX,
+    py::array_t<T> cdevY,
+    py::array_t<T> cdevZ,
     py::array_t<double> positions,
     py::array_t<double> centers,
     py::array_t<int> center_indices,
-    py::array_t<double> alphasArr,
-    py::array_t<double> betasArr,
+    py::array_t<double> aOaArr,
+    py::array_t<double> bOaArr,
     py::array_t<int> atomicNumbersArr,
     py::array_t<int> orderedSpeciesArr,
     const double rCut,
@@ -2388,6 +2522,8 @@ void soapGTO(
     const int nMax,
     const int lMax,
     const double eta,
+    const double radialGrid,
+    py::array_t<double> expTableArr,
     py::dict weighting,
     const bool crossover,
     string average,
@@ -2404,11 +2540,12 @@ void soapGTO(
   auto species = orderedSpeciesArr.unchecked<1>();
   int nSpecies = orderedSpeciesArr.shape(0);
   auto indices_u = indices.unchecked<1>();
-  double *alphas = (double*)alphasArr.request().ptr;
-  double *betas = (double*)betasArr.request().ptr;
-  double oOeta = 1.0/eta;
-  double oOeta3O2 = sqrt(oOeta*oOeta*oOeta);
-  double nMax2 = nMax*nMax;
+  double *aOa = (double*)aOaArr.request().ptr;
+  double *bOa = (double*)bOaArr.request().ptr;
+  // Optional tabulation of the radial Gaussians, see getExpTableD.
+  const int nGrid = expTableArr.shape(1);
+  const double* expTable = nGrid > 0 ? (const double*)expTableArr.request().ptr : nullptr;
+  const double oOgrid = nGrid > 0 ? 1.0/radialGrid : 0.0;
   auto centers_u = centers.unchecked<2>(); 
   auto center_indices_u = center_indices.unchecked<1>(); 
   auto positions_u = positions.unchecked<2>(); 
@@ -2445,8 +2582,6 @@ void soapGTO(
     prCofDZ = (double*) malloc(((lMax+1)*(lMax+1)-4)*sizeof(double)*totalAN);
   }
 
-  double* bOa = (double*) malloc((lMax+1)*nMax2*sizeof(double));
-  double* aOa = (double*) malloc((lMax+1)*nMax*sizeof(double));
   
   // Initialize temporary numpy array for storing the coefficients and the
   // averaged coefficients if inner averaging was requested.
@@ -2461,14 +2596,14 @@ void soapGTO(
   }
 
   auto cnnd_u = cnnd.unchecked<4>();
-  auto cdevX_u = cdevX.unchecked<5>();
-  auto cdevY_u = cdevY.unchecked<5>();
-  auto cdevZ_u = cdevZ.unchecked<5>();
+  auto cdevX_u = cdevX.template unchecked<5>();
+  auto cdevY_u = cdevY.template unchecked<5>();
+  auto cdevZ_u = cdevZ.template unchecked<5>();
 
   auto cnnd_mu = cnnd.mutable_unchecked<4>(); 
-  auto cdevX_mu = cdevX.mutable_unchecked<5>();
-  auto cdevY_mu = cdevY.mutable_unchecked<5>();
-  auto cdevZ_mu = cdevZ.mutable_unchecked<5>();
+  auto cdevX_mu = cdevX.template mutable_unchecked<5>();
+  auto cdevY_mu = cdevY.template mutable_unchecked<5>();
+  auto cdevZ_mu = cdevZ.template mutable_unchecked<5>();
 
   // Initialize binning for atoms and centers
   CellList cell_list_centers(centers, rCut+cutoffPadding);
@@ -2480,7 +2615,11 @@ void soapGTO(
       ZIndexMap[species(i)] = i;
   }
 
-  getAlphaBetaD(aOa,bOa,alphas,betas,nMax,lMax,oOeta, oOeta3O2);
+  // The weighting parameters are read before releasing the GIL, as the loop
+  // over the centers does not touch any python objects.
+  const Weighting weighting_params = getWeighting(weighting);
+  {
+  py::gil_scoped_release release;
 
   // Loop through the centers
   for (int i = 0; i < nCenters; i++) {
@@ -2505,11 +2644,12 @@ void soapGTO(
       // Save the neighbour distances into the arrays dx, dy and dz
       getDeltaD(dx, dy, dz, positions, ix, iy, iz, ZIndexPair.second);
       getRsZsD(dx, x2, x4, x6, x8, x10, x12, x14, x16, x18, dy, y2, y4, y6, y8, y10, y12, y14, y16, y18, dz, r2, r4, r6, r8, r10, r12, r14, r16, r18,  z2, z4, z6, z8, z10, z12, z14, z16, z18, r20, x20, y20, z20, n_neighbours, lMax);
-      getWeights(n_neighbours, r1, r2, true, weighting, weights);
+      getWeights(n_neighbours, r1, r2, true, weighting_params, weights);
       getCfactorsD(preCoef, prCofDX, prCofDY, prCofDZ, n_neighbours, dx,x2, x4, x6, x8,x10,x12,x14,x16,x18, dy,y2, y4, y6, y8,y10,y12,y14,y16,y18, dz, z2, z4, z6, z8,z10,z12,z14,z16,z18, r2, r4, r6, r8,r10,r12,r14,r16,r18,r20, x20,y20,z20, totalAN, lMax, return_derivatives);
-      getCD(cdevX_mu, cdevY_mu, cdevZ_mu, prCofDX, prCofDY, prCofDZ, cnnd_mu, preCoef, dx, dy, dz, r2, weights, bOa, aOa, exes, totalAN, n_neighbours, nMax, nSpecies, lMax, i, centerAtomI, j, ZIndexPair.second, attach, return_derivatives);
+      getCD(cdevX_mu, cdevY_mu, cdevZ_mu, prCofDX, prCofDY, prCofDZ, cnnd_mu, preCoef, dx, dy, dz, r2, weights, bOa, aOa, expTable, nGrid, oOgrid, exes, totalAN, n_neighbours, nMax, nSpecies, lMax, i, centerAtomI, j, ZIndexPair.second, attach, return_derivatives);
     }
   }
+  }
   free(dx); free(x2); free(x4); free(x6); free(x8); free(x10); free(x12); free(x14); free(x16); free(x18);
   free(dy); free(y2); free(y4); free(y6); free(y8); free(y10); free(y12); free(y14); free(y16); free(y18);
   free(dz); free(z2); free(z4); free(z6); free(z8); free(z10); free(z12); free(z14); free(z16); free(z18);
@@ -2519,7 +2659,7 @@ void soapGTO(
   free(x20);
   free(y20);
   free(z20);
-  free(exes); free(preCoef); free(bOa); free(aOa); free(cnnd_raw); free(weights);
+  free(exes); free(preCoef); free(cnnd_raw); free(weights);
 
   if (return_derivatives) {
     free(prCofDX); free(prCofDY); free(prCofDZ);
@@ -2583,3 +2723,64 @@ void soapGTO(
 
   return;
 }
+
+// The derivatives of the coefficients can be stored in single or double
+// precision.
+template void soapGTO<double>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<double> cdevX,
+    py::array_t<double> cdevY,
+    py::array_t<double> cdevZ,
+    py::array_t<double> positions,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<double> aOaArr,
+    py::array_t<double> bOaArr,
+    py::array_t<int> atomicNumbersArr,
+    py::array_t<int> orderedSpeciesArr,
+    const double rCut,
+    const double cutoffPadding,
+    const int Ns,
+    const int lMax,
+    const double eta,
+    const double radialGrid,
+    py::array_t<double> expTableArr,
+    py::dict weighting,
+    const bool crossover,
+    string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
+    CellList cell_list
+);
+template void soapGTO<float>(
+    py::array_t<double> derivatives,
+    py::array_t<double> descriptor,
+    py::array_t<float> cdevX,
+    py::array_t<float> cdevY,
+    py::array_t<float> cdevZ,
+    py::array_t<double> positions,
+    py::array_t<double> centers,
+    py::array_t<int> center_indices,
+    py::array_t<double> aOaArr,
+    py::array_t<double> bOaArr,
+    py::array_t<int> atomicNumbersArr,
+    py::array_t<int> orderedSpeciesArr,
+    const double rCut,
+    const double cutoffPadding,
+    const int Ns,
+    const int lMax,
+    const double eta,
+    const double radialGrid,
+    py::array_t<double> expTableArr,
+    py::dict weighting,
+    const bool crossover,
+    string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
+    CellList cell_list
+);
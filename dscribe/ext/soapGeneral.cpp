@@ -1599,80 +1599,6 @@ double* getFlir(double* oO4arri,double* ri, double* minExp, double* pluExp, int
 
     return Flir;
 }
-double legendre_poly(int l, int m, double x)
-{
-    double fact,pll,pmm,pmmp1,somx2;
-    int ll;
-
-    if (m < 0 || m > l || fabs(x) > 1.0) {
-        printf("ERROR: Bad arguments in routine legendre_poly"); exit(1);
-    }
-
-    pmm = 1.0;
-
-    if (m > 0) {
-        somx2=sqrt((1.0 - x)*(1.0 + x));
-        fact=1.0;
-        for (int i=1; i <= m; i++) {
-            pmm *= -fact*somx2;
-            fact += 2.0;
-        }
-    }
-
-    if (l == m) {
-        return pmm;
-    } else {
-        pmmp1 = x*(2*m+1)*pmm;
-        if (l==(m+1)) {
-            return pmmp1;
-        } else {
-            for (ll=m+2; ll<=l; ll++) {
-                pll=(x*(2*ll-1)*pmmp1 - (ll+m-1)*pmm)/ (double) (ll-m);
-                pmm = pmmp1;
-                pmmp1= pll;
-
-            }
-            return pll;
-        }
-    }
-}
-double* getYlmi(double* x, double* y, double* z, double* oOri, double* cf, int icount, int lMax)
-{
-    double* Ylmi = (double*) malloc(2*sd*(lMax+1)*(lMax+1)*icount);
-    double* legPol = (double*) malloc(sd*(lMax+1)*(lMax+1)*icount);
-    double* ChiCos= (double*) malloc(sd*(lMax+1)*icount);
-    double* ChiSin= (double*) malloc(sd*(lMax+1)*icount);
-    double myAtan2;
-
-    for (int i = 0; i < icount; i++) {
-        for (int l = 0; l < lMax + 1; l++) {
-            for (int m = 0; m < l+1; m++) {
-                legPol[icount*(lMax+1)*l + icount*m + i] = legendre_poly(l,m,z[i]*oOri[i]);
-            }
-        }
-        for (int m = 0; m < lMax+1; m++) {
-            myAtan2 = m*atan2(y[i],x[i]);
-            ChiCos[m*icount + i] = cos(myAtan2);
-            ChiSin[m*icount + i] = sin(myAtan2);
-        }
-    }
-
-    for (int l = 0; l < lMax+1; l++) {
-        for (int m = 0; m < l+1; m++) {
-            for (int i = 0; i < icount; i++) {
-                Ylmi[2*(lMax+1)*icount*l + 2*icount*m + 2*i]
-                    =  factorY(l,m,cf)*legPol[icount*(lMax+1)*l + icount*m + i]*ChiCos[m*icount + i];
-                Ylmi[2*(lMax+1)*icount*l + 2*icount*m + 2*i + 1]
-                    = factorY(l,m,cf)*legPol[icount*(lMax+1)*l + icount*m + i]*ChiSin[m*icount + i];
-            }
-        }
-    }
-    free(legPol);
-    free(ChiCos);
-    free(ChiSin);
-
-    return Ylmi;
-}
 double* getIntegrand(double* Flir, double* Ylmi, int rsize, int icount, int lMax, double* weights)
 {
     double* summed = (double*) malloc(2*sd*(lMax+1)*rsize*(lMax+1));
@@ -1723,6 +1649,228 @@ void getC(double* C, double* ws, double* rw2, double * gns, double* summed, doub
     }
 }
 
+/**
+ * Used to calculate the derivatives of the radial functions F_l(r, r_i) with
+ * respect to the neighbour distance r_i. The derivatives follow the same
+ * recursion as getFlir, and are zero wherever the recursion was clipped.
+ */
+double* getdFlir(double* oO4arri, double* ri, double* rw, double* minExp, double* pluExp, double* Flir, double eta, int icount, int rsize, int lMax)
+{
+    double* dFlir = (double*) malloc(sd*(lMax+1)*icount*rsize);
+    //l=0 and l=1
+    for (int i = 0; i < icount; i++) {
+        for (int w = 0; w < rsize; w++) {
+            int idx = rsize*i + w;
+            double a = oO4arri[idx];
+            double da = -a/ri[i];
+            double M = minExp[idx];
+            double P = pluExp[idx];
+            double dM = 2*eta*(rw[w] - ri[i])*M;
+            double dP = -2*eta*(rw[w] + ri[i])*P;
+            dFlir[idx] = da*(M - P) + a*(dM - dP);
+            if (lMax>0) {
+                dFlir[rsize*icount + idx] = da*(M + P - 2*Flir[idx]) + a*(dM + dP - 2*dFlir[idx]);
+            }
+        }
+    }
+    //l>1
+    if (lMax>1) {
+        for (int l = 2; l < lMax+1; l++){
+            for (int i = 0; i < icount; i++){
+                for (int w = 0; w < rsize; w++){
+                    int idx = rsize*i + w;
+                    if (Flir[l*rsize*icount+idx] == 0) {
+                        dFlir[l*rsize*icount+idx] = 0.0;
+                    } else {
+                        double a = oO4arri[idx];
+                        double da = -a/ri[i];
+                        dFlir[l*rsize*icount+idx] = dFlir[(l-2)*rsize*icount+idx] - (4*l-2)*(da*Flir[(l-1)*rsize*icount+idx] + a*dFlir[(l-1)*rsize*icount+idx]);
+                    }
+                }
+            }
+        }
+    }
+
+    return dFlir;
+}
+/**
+ * Used to calculate the spherical harmonics for all neighbours. The harmonics
+ * are evaluated directly in cartesian coordinates as
+ * Y_lm = c_lm * Q_lm(z/r) * (x+iy)^m / r^m, where Q_lm is a polynomial given
+ * by the associated Legendre recursion without the (1-u^2)^(m/2) factor. This
+ * avoids all trigonometric functions, and the recursion is run only once per
+ * m instead of once per (l, m).
+ *
+ * If dYlmi is given, the cartesian gradients are calculated in the same pass,
+ * which also keeps them finite on the z-axis. The gradient of component c
+ * (x=0, y=1, z=2) for (l, m) and neighbour i is stored at index
+ * 2*icount*((lMax+1)*((lMax+1)*c + l) + m) + 2*i (+1 for the imaginary part).
+ */
+double* getYlmi(double* x, double* y, double* z, double* oOri, double* cf, int icount, int lMax, double* dYlmi)
+{
+    int lSize = lMax + 1;
+    double* Ylmi = (double*) malloc(2*sd*lSize*lSize*icount);
+    double* Q = (double*) malloc(sd*(lSize+1)*(lSize+1));
+    double* Zre = (double*) malloc(sd*lSize);
+    double* Zim = (double*) malloc(sd*lSize);
+
+    for (int i = 0; i < icount; i++) {
+        double oOr = oOri[i];
+        double oOr2 = oOr*oOr;
+        double u = z[i]*oOr;
+
+        // Q_lm(u) = (-1)^m d^m P_l(u)/du^m. Q_l,m+1 is needed for the
+        // derivative of Q_lm.
+        memset(Q, 0.0, (lSize+1)*(lSize+1)*sizeof(double));
+        double qmm = 1.0;
+        for (int m = 0; m < lSize; m++) {
+            if (m > 0) {
+                qmm *= -(2*m - 1);
+            }
+            Q[(lSize+1)*m + m] = qmm;
+            if (m + 1 < lSize) {
+                Q[(lSize+1)*(m+1) + m] = u*(2*m+1)*qmm;
+            }
+            for (int l = m+2; l < lSize; l++) {
+                Q[(lSize+1)*l + m] = (u*(2*l-1)*Q[(lSize+1)*(l-1) + m] - (l+m-1)*Q[(lSize+1)*(l-2) + m])/(double)(l-m);
+            }
+        }
+
+        // Powers of (x+iy)
+        Zre[0] = 1;
+        Zim[0] = 0;
+        for (int m = 1; m < lSize; m++) {
+            Zre[m] = Zre[m-1]*x[i] - Zim[m-1]*y[i];
+            Zim[m] = Zre[m-1]*y[i] + Zim[m-1]*x[i];
+        }
+
+        double du[3] = {-u*x[i]*oOr2, -u*y[i]*oOr2, (1 - u*u)*oOr};
+        double rm = 1;
+        for (int m = 0; m < lSize; m++) {
+            double Wre = Zre[m]*rm;
+            double Wim = Zim[m]*rm;
+            for (int l = m; l < lSize; l++) {
+                double f = factorY(l, m, cf);
+                double q = Q[(lSize+1)*l + m];
+                Ylmi[2*lSize*icount*l + 2*icount*m + 2*i] = f*q*Wre;
+                Ylmi[2*lSize*icount*l + 2*icount*m + 2*i + 1] = f*q*Wim;
+            }
+            if (dYlmi != NULL) {
+                double dWre[3] = {-m*Wre*x[i]*oOr2, -m*Wre*y[i]*oOr2, -m*Wre*z[i]*oOr2};
+                double dWim[3] = {-m*Wim*x[i]*oOr2, -m*Wim*y[i]*oOr2, -m*Wim*z[i]*oOr2};
+                if (m > 0) {
+                    dWre[0] += m*Zre[m-1]*rm;
+                    dWim[0] += m*Zim[m-1]*rm;
+                    dWre[1] -= m*Zim[m-1]*rm;
+                    dWim[1] += m*Zre[m-1]*rm;
+                }
+                for (int l = m; l < lSize; l++) {
+                    double f = factorY(l, m, cf);
+                    double q = Q[(lSize+1)*l + m];
+                    double dq = -Q[(lSize+1)*l + m + 1];
+                    for (int c = 0; c < 3; c++) {
+                        int idx = 2*icount*(lSize*(lSize*c + l) + m) + 2*i;
+                        dYlmi[idx] = f*(dq*du[c]*Wre + q*dWre[c]);
+                        dYlmi[idx + 1] = f*(dq*du[c]*Wim + q*dWim[c]);
+                    }
+                }
+            }
+            rm *= oOr;
+        }
+    }
+    free(Q);
+    free(Zre);
+    free(Zim);
+
+    return Ylmi;
+}
+/**
+ * Used to accumulate the derivatives of the coefficients with respect to the
+ * positions of the neighbouring atoms of type typeJ for the center posI.
+ */
+template <typename T>
+void getCDev(
+    py::detail::unchecked_mutable_reference<T, 5> &CDevX_mu,
+    py::detail::unchecked_mutable_reference<T, 5> &CDevY_mu,
+    py::detail::unchecked_mutable_reference<T, 5> &CDevZ_mu,
+    double* dx,
+    double* dy,
+    double* dz,
+    double* ris,
+    double* rw,
+    double* ws,
+    double* rw2,
+    double* gns,
+    double* Flir,
+    double* dFlir,
+    double* Ylmi,
+    double* dYlmi,
+    double* cf,
+    double* weights,
+    double eta,
+    int lMax,
+    int rsize,
+    int nMax,
+    int nNeighbours,
+    int posI,
+    int typeJ,
+    const vector<int> &neighbourIndices,
+    const vector<int> &centeredIndices)
+{
+    int lSize = lMax + 1;
+    for (int n = 0; n < nMax; n++) {
+        for (int l = 0; l < lSize; l++) {
+            for (int i = 0; i < nNeighbours; i++) {
+                double S = 0;
+                double dS = 0;
+                for (int w = 0; w < rsize; w++) {
+                    double g = rw2[w]*ws[w]*gns[rsize*n + w];
+                    S += g*Flir[l*rsize*nNeighbours + rsize*i + w];
+                    dS += g*dFlir[l*rsize*nNeighbours + rsize*i + w];
+                }
+                S *= weights[i];
+                dS *= weights[i]/ris[i];
+                double d[3] = {dx[i], dy[i], dz[i]};
+                int atom = neighbourIndices[i];
+                for (int m = 0; m < l+1; m++) {
+                    double Yre = Ylmi[2*lSize*nNeighbours*l + 2*nNeighbours*m + 2*i];
+                    double Yim = Ylmi[2*lSize*nNeighbours*l + 2*nNeighbours*m + 2*i + 1];
+                    int k = l*2*lSize + 2*m;
+                    double re[3];
+                    double im[3];
+                    for (int c = 0; c < 3; c++) {
+                        int idx = 2*nNeighbours*(lSize*(lSize*c + l) + m) + 2*i;
+                        re[c] = dS*d[c]*Yre + S*dYlmi[idx];
+                        im[c] = dS*d[c]*Yim + S*dYlmi[idx + 1];
+                    }
+                    CDevX_mu(atom, posI, typeJ, n, k) += re[0];
+                    CDevY_mu(atom, posI, typeJ, n, k) += re[1];
+                    CDevZ_mu(atom, posI, typeJ, n, k) += re[2];
+                    CDevX_mu(atom, posI, typeJ, n, k + 1) += im[0];
+                    CDevY_mu(atom, posI, typeJ, n, k + 1) += im[1];
+                    CDevZ_mu(atom, posI, typeJ, n, k + 1) += im[2];
+                }
+            }
+        }
+
+        // Atoms on top of the center only contribute to l=1: in the limit
+        // r_i -> 0, F_1(r, r_i)Y_1m is linear in the displacement.
+        if (lMax > 0 && centeredIndices.size() > 0) {
+            double weight = weights[nNeighbours];
+            double K = 0;
+            for (int w = 0; w < rsize; w++) {
+                K += rw2[w]*ws[w]*gns[rsize*n + w]*exp(-eta*rw2[w])*2.0*eta*rw[w]/3.0;
+            }
+            K *= weight;
+            for (const int &atom : centeredIndices) {
+                CDevZ_mu(atom, posI, typeJ, n, 2*lSize) += K*factorY(1, 0, cf);
+                CDevX_mu(atom, posI, typeJ, n, 2*lSize + 2) -= K*factorY(1, 1, cf);
+                CDevY_mu(atom, posI, typeJ, n, 2*lSize + 3) -= K*factorY(1, 1, cf);
+            }
+        }
+    }
+}
+
 void accumC(double* Cs, double* C, int lMax, int nMax, int typeI, int i, int nCoeffs)
 {
     for (int n = 0; n < nMax; n++) {
@@ -1750,11 +1898,30 @@ void getP(py::detail::unchecked_mutable_reference<double, 2> &Ps, double* Cs, in
     // The current index in the final power spectrum array.
     int pIdx = 0;
 
+    // Species without neighbours around a center have only zero
+    // coefficients. Their blocks in the zero-initialized output are skipped.
+    const int speciesSize = 2*(lMax+1)*(lMax+1)*nMax;
+    vector<bool> present(Nt);
+
     for (int i = 0; i < Hs; i++) {
         pIdx = 0;
+        for (int Z = 0; Z < Nt; Z++) {
+            const double* CsZ = &Cs[i*nCoeffs + Z*speciesSize];
+            present[Z] = false;
+            for (int j = 0; j < speciesSize; j++) {
+                if (CsZ[j] != 0) {
+                    present[Z] = true;
+                    break;
+                }
+            }
+        }
         for (int Z1 = 0; Z1 < Nt; Z1++) {
             int Z2Limit = crossover ? Nt : Z1+1;
             for (int Z2 = Z1; Z2 < Z2Limit; Z2++) {
+                if (!present[Z1] || !present[Z2]) {
+                    pIdx += Z1 == Z2 ? (lMax+1)*nMax*(nMax+1)/2 : (lMax+1)*nMax*nMax;
+                    continue;
+                }
                 // If the species are identical, then there is symmetry in the
                 // radial basis and we only loop N2 from N1 to nMax
                 if (Z1 == Z2) {
@@ -1806,10 +1973,85 @@ void getP(py::detail::unchecked_mutable_reference<double, 2> &Ps, double* Cs, in
         }
     }
 }
+/**
+ * Used to calculate the partial power spectrum derivatives. The derivatives
+ * of the coefficients are stored in the same complex layout as the
+ * coefficients themselves.
+ */
+template <typename T>
+void getPDev(
+    py::detail::unchecked_mutable_reference<double, 4> &derivatives_mu,
+    py::detail::unchecked_reference<double, 2> &positions_u,
+    py::detail::unchecked_reference<int, 1> &indices_u,
+    CellList &cellListCenters,
+    py::detail::unchecked_reference<T, 5> &CDevX_u,
+    py::detail::unchecked_reference<T, 5> &CDevY_u,
+    py::detail::unchecked_reference<T, 5> &CDevZ_u,
+    double* Cs,
+    int Nt,
+    int lMax,
+    int nMax,
+    double rCut2,
+    bool crossover,
+    int nCoeffs)
+{
+    int lSize = lMax + 1;
+    const py::detail::unchecked_reference<T, 5>* CDevs[3] = {&CDevX_u, &CDevY_u, &CDevZ_u};
+
+    // Loop over all given atomic indices for which the derivatives should be
+    // calculated for.
+    for (int i_idx = 0; i_idx < indices_u.size(); ++i_idx) {
+        int i_atom = indices_u(i_idx);
+
+        // Get all neighbouring centers for the current atom
+        double ix = positions_u(i_atom, 0);
+        double iy = positions_u(i_atom, 1);
+        double iz = positions_u(i_atom, 2);
+        CellListResult result = cellListCenters.getNeighboursForPosition(ix, iy, iz);
+
+        for (const int &i : result.indices) {
+            int pIdx = 0;
+            for (int Z1 = 0; Z1 < Nt; Z1++) {
+                int Z2Limit = crossover ? Nt : Z1+1;
+                for (int Z2 = Z1; Z2 < Z2Limit; Z2++) {
+                    for (int l = 0; l < lSize; l++) {
+                        double prel = PI*sqrt(8.0/(2.0*l+1.0))*39.478417604*rCut2;
+                        for (int N1 = 0; N1 < nMax; N1++) {
+                            for (int N2 = Z1 == Z2 ? N1 : 0; N2 < nMax; N2++) {
+                                double* C1 = &Cs[i*nCoeffs + 2*Z1*lSize*lSize*nMax + 2*lSize*lSize*N1 + l*2*lSize];
+                                double* C2 = &Cs[i*nCoeffs + 2*Z2*lSize*lSize*nMax + 2*lSize*lSize*N2 + l*2*lSize];
+                                for (int c = 0; c < 3; c++) {
+                                    const py::detail::unchecked_reference<T, 5> &CDev = *CDevs[c];
+                                    double sum = CDev(i_atom, i, Z1, N1, l*2*lSize)*C2[0]
+                                               + C1[0]*CDev(i_atom, i, Z2, N2, l*2*lSize);
+                                    for (int m = 1; m < l+1; m++) {
+                                        int k = l*2*lSize + 2*m;
+                                        sum += 2*(CDev(i_atom, i, Z1, N1, k)*C2[2*m]
+                                                + C1[2*m]*CDev(i_atom, i, Z2, N2, k)
+                                                + CDev(i_atom, i, Z1, N1, k + 1)*C2[2*m + 1]
+                                                + C1[2*m + 1]*CDev(i_atom, i, Z2, N2, k + 1));
+                                    }
+                                    derivatives_mu(i, i_idx, c, pIdx) += prel*sum;
+                                }
+                                ++pIdx;
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+template <typename T>
 void soapGeneral(
+    py::array_t<double> derivatives,
     py::array_t<double> PsArr,
+    py::array_t<T> cdevX,
+    py::array_t<T> cdevY,
+    py::array_t<T> cdevZ,
     py::array_t<double> positions,
     py::array_t<double> HposArr,
+    py::array_t<int> center_indices,
     py::array_t<int> atomicNumbersArr,
     py::array_t<int> orderedSpeciesArr,
     double rCut,
@@ -1822,6 +2064,10 @@ void soapGeneral(
     py::array_t<double> gssArr,
     bool crossover,
     string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
     CellList cellList)
 {
     int nAtoms = atomicNumbersArr.shape(0);
@@ -1831,6 +2077,16 @@ void soapGeneral(
     auto atomicNumbers = atomicNumbersArr.unchecked<1>();
     auto species = orderedSpeciesArr.unchecked<1>();
     auto Ps = PsArr.mutable_unchecked<2>();
+    auto derivatives_mu = derivatives.mutable_unchecked<4>();
+    auto cdevX_mu = cdevX.template mutable_unchecked<5>();
+    auto cdevY_mu = cdevY.template mutable_unchecked<5>();
+    auto cdevZ_mu = cdevZ.template mutable_unchecked<5>();
+    auto cdevX_u = cdevX.template unchecked<5>();
+    auto cdevY_u = cdevY.template unchecked<5>();
+    auto cdevZ_u = cdevZ.template unchecked<5>();
+    auto center_indices_u = center_indices.unchecked<1>();
+    auto indices_u = indices.unchecked<1>();
+    auto positions_u = positions.unchecked<2>();
     double *Hpos = (double*)HposArr.request().ptr;
     double *rw = (double*)rwArr.request().ptr;
     double *gss = (double*)gssArr.request().ptr;
@@ -1869,8 +2125,16 @@ void soapGeneral(
         ZIndexMap[species(i)] = i;
     }
 
+    // The weighting parameters are read before releasing the GIL, as the loop
+    // over the centers does not touch any python objects.
+    const Weighting weighting_params = getWeighting(weighting);
+    {
+    py::gil_scoped_release release;
+
     // Loop through central points
     for (int i = 0; i < Hs; i++) {
+        // If computing derivatives with attach=True, index of the center atom is needed
+        int centerAtomI = (return_derivatives && attach) ? center_indices_u(i) : -1;
 
         // Get all neighbours for the central atom i
         double ix = Hpos[3*i];
@@ -1900,53 +2164,113 @@ void soapGeneral(
             int nNeighbours = neighbours.first;
             int nCenters = neighbours.second;
 
-            getWeights(nNeighbours + min(nCenters, 1), ris, NULL, false, weighting, weights);
+            getWeights(nNeighbours + min(nCenters, 1), ris, NULL, false, weighting_params, weights);
             Flir = getFlir(oO4arri, ris, minExp, pluExp, nNeighbours, rsize, lMax);
-            Ylmi = getYlmi(dx, dy, dz, oOri, cf, nNeighbours, lMax);
+            // The gradients of the spherical harmonics are calculated in the
+            // same pass if derivatives are requested.
+            double* dYlmi = NULL;
+            if (return_derivatives) {
+                dYlmi = (double*) malloc(3*2*sd*(lMax+1)*(lMax+1)*nNeighbours);
+            }
+            Ylmi = getYlmi(dx, dy, dz, oOri, cf, nNeighbours, lMax, dYlmi);
             summed = getIntegrand(Flir, Ylmi, rsize, nNeighbours, lMax, weights);
 
             getC(C, ws, rw2, gss, summed, rCut, lMax, rsize, nMax, nCenters, nNeighbours, eta, weights);
             accumC(Cs, C, lMax, nMax, j, i, nCoeffs);
-            
+
+            if (return_derivatives) {
+                // The atom indices in the same order as used by getDeltas
+                vector<int> neighbourIndices;
+                vector<int> centeredIndices;
+                for (const int &idx : ZIndexPair.second) {
+                    double Xi = positions_u(idx, 0) - ix;
+                    double Yi = positions_u(idx, 1) - iy;
+                    double Zi = positions_u(idx, 2) - iz;
+                    if (Xi*Xi + Yi*Yi + Zi*Zi <= 1e-12) {
+                        centeredIndices.push_back(idx);
+                    } else {
+                        neighbourIndices.push_back(idx);
+                    }
+                }
+                double* dFlir = getdFlir(oO4arri, ris, rw, minExp, pluExp, Flir, eta, nNeighbours, rsize, lMax);
+                getCDev(cdevX_mu, cdevY_mu, cdevZ_mu, dx, dy, dz, ris, rw, ws, rw2, gss, Flir, dFlir, Ylmi, dYlmi, cf, weights, eta, lMax, rsize, nMax, nNeighbours, i, j, neighbourIndices, centeredIndices);
+                free(dFlir);
+                free(dYlmi);
+
+                // If attach=True, the derivative with respect to the center
+                // atom coordinates is the negative sum of derivatives with
+                // respect to coordinates of other atoms in the the
+                // neighbourhood.
+                if (attach && centerAtomI >= 0) {
+                    for (int n = 0; n < nMax; n++) {
+                        for (int k = 0; k < 2*(lMax+1)*(lMax+1); k++) {
+                            double sumX = 0;
+                            double sumY = 0;
+                            double sumZ = 0;
+                            for (const int &idx : ZIndexPair.second) {
+                                if (idx != centerAtomI) {
+                                    sumX += cdevX_mu(idx, i, j, n, k);
+                                    sumY += cdevY_mu(idx, i, j, n, k);
+                                    sumZ += cdevZ_mu(idx, i, j, n, k);
+                                }
+                            }
+                            cdevX_mu(centerAtomI, i, j, n, k) = -sumX;
+                            cdevY_mu(centerAtomI, i, j, n, k) = -sumY;
+                            cdevZ_mu(centerAtomI, i, j, n, k) = -sumZ;
+                        }
+                    }
+                }
+            }
+
             free(Flir);
             free(Ylmi);
             free(summed);
         }
     }
+    }
 
-    // If inner averaging is requested, average the coefficients over the
-    // positions (axis 0 in cnnd matrix) before calculating the power spectrum.
-    if (average == "inner") {
-        for (int i = 0; i < Hs; i++) {
+    // Calculate the descriptor value if requested
+    if (return_descriptor) {
+        // If inner averaging is requested, average the coefficients over the
+        // positions (axis 0 in cnnd matrix) before calculating the power spectrum.
+        if (average == "inner") {
+            for (int i = 0; i < Hs; i++) {
+                for (int j = 0; j < nCoeffs; j++) {
+                    CsAve[j] += Cs[i*nCoeffs + j];
+                }
+            }
             for (int j = 0; j < nCoeffs; j++) {
-                CsAve[j] += Cs[i*nCoeffs + j];
+                CsAve[j] = CsAve[j] / (double)Hs;
+            }
+            getP(Ps, CsAve, Nt, lMax, nMax, 1, rCut2, nFeatures, crossover, nCoeffs);
+            free(CsAve);
+        // Average the power spectrum across atoms
+        } else if (average == "outer") {
+            // We allocate the memory and give array_t a pointer to it. This way
+            // the memory is owned and freed by C++.
+            double* PsTemp = new double[nFeatures*Hs]();
+            py::array_t<double> PsTempArrChecked({Hs, nFeatures}, PsTemp);
+            auto PsTempArr = PsTempArrChecked.mutable_unchecked<2>();
+            getP(PsTempArr, Cs, Nt, lMax, nMax, Hs, rCut2, nFeatures, crossover, nCoeffs);
+            for (int i = 0; i < Hs; i++) {
+                for (int j = 0; j < nFeatures; j++) {
+                    Ps(0, j) += PsTempArr(i, j);
+                }
             }
-        }
-        for (int j = 0; j < nCoeffs; j++) {
-            CsAve[j] = CsAve[j] / (double)Hs;
-        }
-        getP(Ps, CsAve, Nt, lMax, nMax, 1, rCut2, nFeatures, crossover, nCoeffs);
-        free(CsAve);
-    // Average the power spectrum across atoms
-    } else if (average == "outer") {
-        // We allocate the memory and give array_t a pointer to it. This way
-        // the memory is owned and freed by C++.
-        double* PsTemp = new double[nFeatures*Hs];
-        py::array_t<double> PsTempArrChecked({Hs, nFeatures}, PsTemp);
-        auto PsTempArr = PsTempArrChecked.mutable_unchecked<2>();
-        getP(PsTempArr, Cs, Nt, lMax, nMax, Hs, rCut2, nFeatures, crossover, nCoeffs);
-        for (int i = 0; i < Hs; i++) {
             for (int j = 0; j < nFeatures; j++) {
-                Ps(0, j) += PsTempArr(i, j);
+                Ps(0, j) = Ps(0, j) / (double)Hs;
             }
+            free(PsTemp);
+        // Regular power spectrum without averaging
+        } else {
+            getP(Ps, Cs, Nt, lMax, nMax, Hs, rCut2, nFeatures, crossover, nCoeffs);
         }
-        for (int j = 0; j < nFeatures; j++) {
-            Ps(0, j) = Ps(0, j) / (double)Hs;
-        }
-        free(PsTemp);
-    // Regular power spectrum without averaging
-    } else {
-        getP(Ps, Cs, Nt, lMax, nMax, Hs, rCut2, nFeatures, crossover, nCoeffs);
+    }
+
+    // Calculate the derivatives
+    if (return_derivatives) {
+        CellList cellListCenters(HposArr, rCut+cutoffPadding);
+        getPDev(derivatives_mu, positions_u, indices_u, cellListCenters, cdevX_u, cdevY_u, cdevZ_u, Cs, Nt, lMax, nMax, rCut2, crossover, nCoeffs);
     }
 
     free(Cs);
@@ -1964,3 +2288,60 @@ void soapGeneral(
     free(pluExp);
     free(C);
 }
+
+// The derivatives of the coefficients can be stored in single or double
+// precision.
+template void soapGeneral<double>(
+    py::array_t<double> derivatives,
+    py::array_t<double> PsArr,
+    py::array_t<double> cdevX,
+    py::array_t<double> cdevY,
+    py::array_t<double> cdevZ,
+    py::array_t<double> positions,
+    py::array_t<double> HposArr,
+    py::array_t<int> center_indices,
+    py::array_t<int> atomicNumbersArr,
+    py::array_t<int> orderedSpeciesArr,
+    double rCut,
+    double cutoffPadding,
+    int nMax,
+    int lMax,
+    double eta,
+    py::dict weighting,
+    py::array_t<double> rwArr,
+    py::array_t<double> gssArr,
+    bool crossover,
+    string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
+    CellList cellList
+);
+template void soapGeneral<float>(
+    py::array_t<double> derivatives,
+    py::array_t<double> PsArr,
+    py::array_t<float> cdevX,
+    py::array_t<float> cdevY,
+    py::array_t<float> cdevZ,
+    py::array_t<double> positions,
+    py::array_t<double> HposArr,
+    py::array_t<int> center_indices,
+    py::array_t<int> atomicNumbersArr,
+    py::array_t<int> orderedSpeciesArr,
+    double rCut,
+    double cutoffPadding,
+    int nMax,
+    int lMax,
+    double eta,
+    py::dict weighting,
+    py::array_t<double> rwArr,
+    py::array_t<double> gssArr,
+    bool crossover,
+    string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
+    CellList cellList
+);
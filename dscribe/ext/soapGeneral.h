@@ -34,16 +34,22 @@ inline void expPs(double* rExpSum, double eta, double* r, double* ri, int isize,
 pair<int, int> getDeltas(double* xNow, double* yNow, double* zNow, double* ri, double* rw, double rCut, double* oOri, double* oO4arri, double* minExp, double* pluExp,int* isCenter, double eta, const py::array_t<double> &positions, const double ix, const double iy, const double iz, const vector<int> &indices, int rsize, int Ihpos, int Itype);
 int getFilteredPos(double* xNow, double* yNow, double* zNow, double* ri, double* rw, double rCut, double* oOri, double* oO4arri, double* minExp, double* pluExp,int* isCenter, double eta, double* Apos, double* Hpos,int* typeNs, int rsize, int Ihpos, int Itype);
 double* getFlir(double* oO4arri,double* ri, double* minExp, double* pluExp, int icount, int rsize, int lMax);
-double legendre_poly(int l, int m, double x);
-double* getYlmi(double* x, double* y, double* z, double* oOri, double* cf, int icount, int lMax);
+double* getYlmi(double* x, double* y, double* z, double* oOri, double* cf, int icount, int lMax, double* dYlmi);
 double* getIntegrand(double* Flir, double* Ylmi,int rsize, int icount, int lMax);
 void getC(double* Cs, double* ws, double* rw2, double * gns, double* summed, double rCut,int lMax, int rsize, int gnsize, int nCenters, int nNeighbours, double eta, double* weights);
 void accumC(double* Cs, double* C, int lMax, int gnsize, int typeI, int i, int nCoeffs);
+double* getdFlir(double* oO4arri, double* ri, double* rw, double* minExp, double* pluExp, double* Flir, double eta, int icount, int rsize, int lMax);
 void getP(py::detail::unchecked_mutable_reference<double, 2> &Ps, double* Cts, int Nt, int lMax, int nMax, int Hs, double rCut2, int nFeatures, bool crossover, int nCoeffs);
+template <typename T>
 void soapGeneral(
+    py::array_t<double> derivatives,
     py::array_t<double> PsArr,
+    py::array_t<T> cdevX,
+    py::array_t<T> cdevY,
+    py::array_t<T> cdevZ,
     py::array_t<double> positions,
     py::array_t<double> HposArr,
+    py::array_t<int> center_indices,
     py::array_t<int> atomicNumbersArr,
     py::array_t<int> orderedSpeciesArr,
     double rCut,
@@ -56,6 +62,10 @@ void soapGeneral(
     py::array_t<double> gssArr,
     bool crossover,
     string average,
+    py::array_t<int> indices,
+    const bool attach,
+    const bool return_descriptor,
+    const bool return_derivatives,
     CellList cellList
 );
 
@@ -3,14 +3,39 @@
 namespace py = pybind11;
 using namespace std;
 
+Weighting getWeighting(const py::dict &weighting) {
+    Weighting params;
+    params.has_function = weighting.contains("function");
+    params.has_w0 = weighting.contains("w0");
+    if (params.has_w0) {
+        params.w0 = weighting["w0"].cast<double>();
+    }
+    if (params.has_function) {
+        params.function = weighting["function"].cast<string>();
+        if (weighting.contains("r0")) {
+            params.r0 = weighting["r0"].cast<double>();
+        }
+        if (weighting.contains("c")) {
+            params.c = weighting["c"].cast<double>();
+        }
+        if (weighting.contains("d")) {
+            params.d = weighting["d"].cast<double>();
+        }
+        if (weighting.contains("m")) {
+            params.m = weighting["m"].cast<double>();
+        }
+    }
+    return params;
+}
+
 /**
  * Used to calculate the Gaussian weights for each neighbouring atom. Provide
  * either r1s (=r) or r2s (=r^2) and use the boolean "squared" to indicate if
  * r1s should be calculated from r2s.
  */
-void getWeights(int size, double* r1s, double* r2s, const bool squared, const py::dict &weighting, double* weights) {
+void getWeights(int size, double* r1s, double* r2s, const bool squared, const Weighting &weighting, double* weights) {
     // No weighting specified
-    if (!weighting.contains("function") && !weighting.contains("w0")) {
+    if (!weighting.has_function && !weighting.has_w0) {
         for (int i = 0; i < size; i++) {
             weights[i] = 1;
         }
@@ -21,8 +46,8 @@ void getWeights(int size, double* r1s, double* r2s, const bool squared, const py
                 r1s[i] = sqrt(r2s[i]);
             }
         }
-        if (!weighting.contains("function") && weighting.contains("w0")) {
-            double w0 = weighting["w0"].cast<double>();
+        if (!weighting.has_function && weighting.has_w0) {
+            double w0 = weighting.w0;
             for (int i = 0; i < size; i++) {
                 double r = r1s[i];
                 if (r == 0) {
@@ -33,27 +58,21 @@ void getWeights(int size, double* r1s, double* r2s, const bool squared, const py
             }
         } else {
             function<double (double)> func;
-            string fname = weighting["function"].cast<string>();
+            const string &fname = weighting.function;
+            double r0 = weighting.r0;
+            double c = weighting.c;
+            double d = weighting.d;
+            double m = weighting.m;
             if (fname == "poly") {
-                double r0 = weighting["r0"].cast<double>();
-                double c = weighting["c"].cast<double>();
-                double m = weighting["m"].cast<double>();
                 func = [r0, c, m](double r) {return weightPoly(r, r0, c, m);};
             } else if (fname == "pow") {
-                double r0 = weighting["r0"].cast<double>();
-                double c = weighting["c"].cast<double>();
-                double d = weighting["d"].cast<double>();
-                double m = weighting["m"].cast<double>();
                 func = [r0, c, d, m](double r) {return weightPow(r, r0, c, d, m);};
             } else if (fname == "exp") {
-                double r0 = weighting["r0"].cast<double>();
-                double c = weighting["c"].cast<double>();
-                double d = weighting["d"].cast<double>();
                 func = [r0, c, d](double r) {return weightExp(r, r0, c, d);};
             }
             // Weighting function and w0
-            if (weighting.contains("w0")) {
-                double w0 = weighting["w0"].cast<double>();
+            if (weighting.has_w0) {
+                double w0 = weighting.w0;
                 for (int i = 0; i < size; i++) {
                     double r = r1s[i];
                     if (r == 0) {
@@ -72,3 +91,7 @@ void getWeights(int size, double* r1s, double* r2s, const bool squared, const py
         }
     }
 }
+
+void getWeights(int size, double* r1s, double* r2s, const bool squared, const py::dict &weighting, double* weights) {
+    getWeights(size, r1s, r2s, squared, getWeighting(weighting), weights);
+}
@@ -2,6 +2,7 @@
 #define WEIGHTING_H
 
 #include <cmath>
+#include <string>
 #include <pybind11/pybind11.h>
 
 /**
@@ -36,11 +37,30 @@ inline double weightExp(const double r, const double r0, const double c, const d
     const double rr0 = r / r0;
     return c / (d + exp(-rr0));
 }
+/**
+ * The weighting parameters read from the python dictionary. Storing them in a
+ * plain struct allows the weights to be calculated without holding the GIL.
+ */
+struct Weighting {
+    bool has_function = false;
+    bool has_w0 = false;
+    std::string function;
+    double w0 = 1;
+    double r0 = 1;
+    double c = 1;
+    double d = 1;
+    double m = 1;
+};
+/**
+ * Reads the weighting parameters from the python dictionary.
+ */
+Weighting getWeighting(const pybind11::dict &weighting);
 /**
  * Used to calculate the Gaussian weights for each neighbouring atom. Provide
  * either r1s (=r) or r2s (=r^2) and use the boolean "squared" to indicate if
  * r1s should be calculated from r2s.
  */
+void getWeights(int size, double* r1s, double* r2s, const bool squared, const Weighting &weighting, double* weights);
 void getWeights(int size, double* r1s, double* r2s, const bool squared, const pybind11::dict &weighting, double* weights);
 
 #endif
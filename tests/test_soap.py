@@ -1,6 +1,7 @@
 import pytest
 from pathlib import Path
 import itertools
+import pickle
 import numpy as np
 from ase import Atoms
 from conftest import (
@@ -18,6 +19,8 @@ from conftest import (
     assert_derivatives_exclude,
     assert_derivatives_include,
     get_simple_finite,
+    get_simple_periodic,
+    get_complex_periodic,
 )
 from dscribe.descriptors import SOAP
 
@@ -247,7 +250,7 @@ def test_dtype(dtype, sparse):
     assert_dtype(soap, dtype, sparse)
 
 
-@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize("n_jobs", [1, 2, 3])
 @pytest.mark.parametrize("sparse", [True, False])
 @pytest.mark.parametrize(
     "centers",
@@ -263,6 +266,49 @@ def test_parallellization(n_jobs, sparse, centers):
     assert_parallellization(soap, n_jobs, sparse, centers)
 
 
+@pytest.mark.parametrize("sparse", [True, False])
+@pytest.mark.parametrize("centers", [None, [0, 2], [[0, 0, 0], [1, 2, 0], [0, 1, 0]]])
+def test_parallellization_centers(sparse, centers):
+    """Tests that a single system is correctly split across the centers when
+    using several jobs.
+    """
+    system = get_simple_finite()
+    desc = SOAP(species=[1, 8], r_cut=3, n_max=3, l_max=3, sparse=sparse)
+    serial = desc.create(system, centers)
+    parallel = desc.create(system, centers, n_jobs=2)
+    d_serial, c_serial = desc.derivatives(system, centers)
+    d_parallel, c_parallel = desc.derivatives(system, centers, n_jobs=2)
+    if sparse:
+        serial, parallel = serial.todense(), parallel.todense()
+        d_serial, d_parallel = d_serial.todense(), d_parallel.todense()
+        c_serial, c_parallel = c_serial.todense(), c_parallel.todense()
+    assert parallel.shape == serial.shape
+    assert np.allclose(parallel, serial)
+    assert d_parallel.shape == d_serial.shape
+    assert np.allclose(d_parallel, d_serial)
+    assert np.allclose(c_parallel, c_serial)
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+@pytest.mark.parametrize("centers", [None, [0], [[0, 0, 0], [1, 2, 0]]])
+def test_context(periodic, centers):
+    """Tests that a precalculated context gives the same output as the
+    original system.
+    """
+    system = get_simple_periodic() if periodic else get_simple_finite()
+    desc = SOAP(species=[1, 8], r_cut=3, n_max=3, l_max=3, periodic=periodic)
+    context = desc.context(system)
+    expected = desc.create(system, centers)
+    assert np.allclose(desc.create_single(context, centers), expected)
+    assert np.allclose(desc.create(context, centers), expected)
+    assert np.allclose(desc.create(context, centers, n_jobs=2), expected)
+
+    # A context cannot be used with a descriptor with different settings
+    other = SOAP(species=[1, 8], r_cut=4, n_max=3, l_max=3, periodic=periodic)
+    with pytest.raises(ValueError):
+        other.create(context, centers)
+
+
 @pytest.mark.parametrize("cell", ["collapsed_periodic", "collapsed_finite"])
 def test_cell(cell):
     assert_cell(soap, cell)
@@ -333,6 +379,58 @@ def test_derivatives_analytical(pbc, attach, average, rbf, crossover):
     assert_derivatives(descriptor_func, "analytical", pbc, attach=attach)
 
 
+@pytest.mark.parametrize("attach", (False, True))
+@pytest.mark.parametrize("crossover", (True, False))
+def test_derivatives_analytical_polynomial(attach, crossover):
+    """Tests the analytical derivatives of the polynomial basis against the
+    numerical ones. The radial integrals of the polynomial basis are
+    numerically noisy for small displacements, which is why the cartesian
+    centers are placed away from the atoms and a larger absolute tolerance is
+    used.
+    """
+    system = get_complex_periodic()
+    system.set_pbc(False)
+    desc = SOAP(
+        species=set(system.get_atomic_numbers()),
+        r_cut=3,
+        n_max=4,
+        l_max=4,
+        rbf="polynomial",
+        crossover=crossover,
+    )
+    if attach:
+        centers = [38, 0]
+    else:
+        centers = [
+            np.sum(system.get_cell(), axis=0) / 2,
+            system.get_positions()[0] + [0.3, -0.2, 0.1],
+        ]
+    d_num, c_num = desc.derivatives(
+        system, centers=centers, attach=attach, method="numerical"
+    )
+    d_anal, c_anal = desc.derivatives(
+        system, centers=centers, attach=attach, method="analytical"
+    )
+    assert np.allclose(c_num, c_anal, atol=1e-6)
+    assert np.max(np.abs(d_anal)) > 1e-8
+    assert np.allclose(d_num, d_anal, rtol=0.5e-3, atol=5e-3)
+
+
+@pytest.mark.parametrize("rbf", ("gto", "polynomial"))
+def test_derivatives_analytical_float32(rbf):
+    """Tests that the analytical derivatives in single precision, which also
+    store the coefficient derivatives in single precision, agree with the
+    double precision results.
+    """
+    system = get_simple_finite()
+    args = {"species": [1, 8], "rbf": rbf, "r_cut": 3, "n_max": 4, "l_max": 4}
+    d64, c64 = SOAP(dtype="float64", **args).derivatives(system, method="analytical")
+    d32, c32 = SOAP(dtype="float32", **args).derivatives(system, method="analytical")
+    assert d32.dtype == np.float32
+    assert np.allclose(d32, d64, rtol=1e-4, atol=1e-4 * np.max(np.abs(d64)))
+    assert np.allclose(c32, c64, rtol=1e-5, atol=1e-6 * np.max(np.abs(c64)))
+
+
 @pytest.mark.parametrize("method", ("numerical", "analytical"))
 def test_derivatives_include(method):
     assert_derivatives_include(soap(), method, False)
@@ -404,6 +502,19 @@ def test_exceptions():
         )
         a.create(system)
 
+    # Invalid radial grid
+    with pytest.raises(ValueError):
+        SOAP(species=["H", "O"], r_cut=5, n_max=5, l_max=5, radial_grid=0)
+    with pytest.raises(ValueError):
+        SOAP(
+            species=["H", "O"],
+            r_cut=5,
+            n_max=5,
+            l_max=5,
+            rbf="polynomial",
+            radial_grid=0.01,
+        )
+
     # Invalid weighting
     args = {
         "r_cut": 2,
@@ -455,17 +566,10 @@ def test_exceptions():
         soap = SOAP(**args)
         soap.derivatives(system, centers=centers, method="analytical")
 
-    # Test that trying to get analytical derivatives with polynomial basis
-    # raises an exception.
-    with pytest.raises(ValueError):
-        args["average"] = "off"
-        args["rbf"] = "polynomial"
-        soap = SOAP(**args)
-        soap.derivatives(system, centers=centers, method="analytical")
-
     # Test that trying to get analytical derivatives with periodicity on
     # raises an exception
     with pytest.raises(ValueError):
+        args["average"] = "off"
         args["periodic"] = True
         args["rbf"] = "rbf"
         soap = SOAP(**args)
@@ -499,6 +603,56 @@ def test_infer_r_cut(weighting, expected_r_cut):
     assert soap._r_cut == pytest.approx(expected_r_cut, rel=1e-8, abs=0)
 
 
+def test_centers_mixed():
+    """Tests that centers given as indices, cartesian positions or a mix of
+    both produce the same output.
+    """
+    system = get_simple_finite()
+    desc = SOAP(species=[1, 8], r_cut=3, n_max=3, l_max=3)
+    positions = system.get_positions()
+
+    feat_indices = desc.create(system, centers=np.array([0, 2]))
+    feat_cartesian = desc.create(system, centers=positions[[0, 2]])
+    feat_mixed = desc.create(system, centers=[0, positions[2]])
+    assert np.array_equal(feat_indices, feat_cartesian)
+    assert np.array_equal(feat_indices, feat_mixed)
+
+
+@pytest.mark.parametrize("rbf", ("gto", "polynomial"))
+def test_pickle(rbf):
+    """Tests that the descriptor can be pickled after the reused extension
+    object has been created.
+    """
+    system = get_simple_finite()
+    desc = SOAP(species=[1, 8], rbf=rbf, r_cut=3, n_max=3, l_max=3)
+    feat = desc.create(system)
+    desc_copy = pickle.loads(pickle.dumps(desc))
+    assert np.array_equal(feat, desc_copy.create(system))
+
+
+@pytest.mark.parametrize("method", ("create", "analytical"))
+def test_radial_grid(method):
+    """Tests that tabulating the radial gaussians on a fine grid closely
+    reproduces the exact output and derivatives.
+    """
+    system = get_complex_periodic()
+    system.set_pbc(False)
+    species = set(system.get_atomic_numbers())
+    args = {"species": species, "r_cut": 3, "n_max": 4, "l_max": 4}
+    exact = SOAP(**args)
+    tabulated = SOAP(radial_grid=1e-4, **args)
+    centers = [0, 38]
+    if method == "create":
+        feat_exact = exact.create(system, centers=centers)
+        feat_tabulated = tabulated.create(system, centers=centers)
+    else:
+        feat_exact, _ = exact.derivatives(system, centers=centers)
+        feat_tabulated, _ = tabulated.derivatives(system, centers=centers)
+    assert not np.array_equal(feat_exact, feat_tabulated)
+    error = np.max(np.abs(feat_exact - feat_tabulated))
+    assert error < 1e-4 * np.max(np.abs(feat_exact))
+
+
 @pytest.mark.parametrize("crossover", (False, True))
 @pytest.mark.parametrize("rbf", ("gto", "polynomial"))
 def test_crossover(crossover, rbf):
@@ -532,6 +686,35 @@ def test_crossover(crossover, rbf):
             assert feat[desc.get_location(pair)].sum() != 0
 
 
+@pytest.mark.parametrize("average", ["off", "inner", "outer"])
+@pytest.mark.parametrize("crossover", (False, True))
+@pytest.mark.parametrize("rbf", ["gto", "polynomial"])
+def test_absent_species(average, crossover, rbf):
+    """Tests that species that are not present in the system give zero output
+    and do not affect the output of the present species.
+    """
+    system = get_simple_finite()
+    kwargs = dict(
+        rbf=rbf, crossover=crossover, average=average, r_cut=3, n_max=3, l_max=3
+    )
+    desc = SOAP(species=[1, 6, 8], **kwargs)
+    desc_present = SOAP(species=[1, 8], **kwargs)
+    feat = desc.create(system)
+    feat_present = desc_present.create(system)
+    n_zero = 0
+    for pair in itertools.combinations_with_replacement([1, 6, 8], 2):
+        if not crossover and pair[0] != pair[1]:
+            continue
+        loc = desc.get_location(pair)
+        if 6 in pair:
+            assert np.all(feat[..., loc] == 0)
+            n_zero += 1
+        else:
+            loc_present = desc_present.get_location(pair)
+            assert np.allclose(feat[..., loc], feat_present[..., loc_present])
+    assert n_zero > 0
+
+
 @pytest.mark.parametrize("rbf", ["gto", "polynomial"])
 def test_average_outer(rbf):
     """Tests the outer averaging (averaging done after calculating power